@@ -16,8 +16,12 @@ PAYMENTS_INDEX = f"{BASE_URL}/market-analysis/payments"
 REPORT_PREFIX = f"{BASE_URL}/industry-reports/"
 
 # Scraping
-REQUEST_DELAY = 2.0  # seconds between requests
+REQUESTS_PER_SECOND = 2.5  # report fetch start rate shared across concurrent workers
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
 
+# Wayback Machine
+WAYBACK_CACHE_DIR = DATA_DIR / "cache" / "wayback"
+WAYBACK_CACHE_TTL = 24 * 60 * 60  # seconds before a cached snapshot query is refetched
+
 # Database
 DB_PATH = DATA_DIR / "mordor.duckdb"
@@ -0,0 +1,44 @@
+"""
+Shared pytest fixtures for the scraper test suite.
+Built once per session and reused across tests.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import duckdb
+import pytest
+
+from src.models.schema import Report
+
+
+SCHEMA_FILE = "src/database/schema.sql"
+
+
+@pytest.fixture(scope="session")
+def sample_report() -> Report:
+    """Known-good report, constructed without Pydantic validation."""
+    return Report.model_construct(
+        slug="test-market",
+        title="Test Report",
+        url="https://www.mordorintelligence.com/industry-reports/test",
+        market_size_current_value=Decimal("100"),
+        cagr_percent=Decimal("10.5"),
+        major_players=["Company A", "Company B"],
+        region="Asia-Pacific",
+        scraped_at=datetime.utcnow(),
+    )
+
+
+@pytest.fixture(scope="session")
+def test_db(tmp_path_factory) -> str:
+    """Path to a DuckDB database with the schema already loaded."""
+    db_path = str(tmp_path_factory.mktemp("db") / "test_version.duckdb")
+
+    conn = duckdb.connect(db_path)
+    with open(SCHEMA_FILE, 'r') as f:
+        conn.execute(f.read())
+    conn.commit()
+    conn.close()
+
+    return db_path
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Optional, Tuple, List, Dict, Any
 import duckdb
 
-from src.models.schema import Report, ReportVersion
+from src.models.schema import Report, ReportVersion, FAQPair
 
 
 class VersionManager:
@@ -24,12 +24,29 @@ class VersionManager:
         self.db_path = db_path
         self.conn = duckdb.connect(db_path)
 
-    def should_create_version(self, report: Report) -> Tuple[bool, Optional[str], Optional[List[str]]]:
+    def load_current_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the current state of all reports in a single query.
+
+        Returns:
+            Dict of slug -> reports row dict, for use with should_create_version
+        """
+        result = self.conn.execute("SELECT * FROM reports").fetchall()
+        columns = [desc[0] for desc in self.conn.description]
+        return {row['slug']: row for row in (dict(zip(columns, values)) for values in result)}
+
+    def should_create_version(
+        self,
+        report: Report,
+        snapshot: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Tuple[bool, Optional[str], Optional[List[str]]]:
         """
         Check if a version should be created for this report.
 
         Args:
             report: Report instance to check
+            snapshot: Optional result of load_current_snapshot(); when given,
+                the existing report is looked up in memory instead of DuckDB
 
         Returns:
             Tuple of (should_create, reason, changed_fields)
@@ -37,7 +54,10 @@ class VersionManager:
             - changed_fields: List of field names that changed (None for new_report)
         """
         # Get existing report by slug
-        existing = self._get_existing_report(report.slug)
+        if snapshot is not None:
+            existing = snapshot.get(report.slug)
+        else:
+            existing = self._get_existing_report(report.slug)
 
         if not existing:
             # New report
@@ -46,8 +66,9 @@ class VersionManager:
         # Compare hashes
         if existing['content_hash'] != report.content_hash:
             # Changes detected
+            # Copy so deserializing JSON fields never mutates a shared snapshot row
             changed_fields = report.get_changed_fields(
-                self._dict_to_report(existing)
+                self._dict_to_report(dict(existing))
             )
             return True, "field_change", changed_fields
 
@@ -71,68 +92,183 @@ class VersionManager:
         Returns:
             Version ID created
         """
-        # Get or create report ID
-        report_id = self._get_or_create_report_id(report)
+        staged = self.stage_version(report, reason, changed_fields)
+        return self.flush_versions([staged])[0]
 
-        # Get next version number
-        version_number = self._get_next_version_number(report_id)
+    def stage_version(
+        self,
+        report: Report,
+        reason: str,
+        changed_fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Prepare a version snapshot without touching the database.
+        Staged versions are written together by flush_versions().
 
-        # Flatten report to dict
-        report_dict = self._flatten_report(report)
+        Args:
+            report: Report to snapshot
+            reason: "new_report" or "field_change"
+            changed_fields: List of fields that changed (for field_change)
 
-        # Create version record - exclude timestamp fields not in report_versions
-        version_dict = {
-            'report_id': report_id,
-            'version_number': version_number,
-            'snapshot_reason': reason,
-            'changed_fields': json.dumps(changed_fields) if changed_fields else None,
-            'scraped_at': report.scraped_at or datetime.utcnow(),
+        Returns:
+            Staged version dict
+        """
+        return {
+            'report': report,
+            'reason': reason,
+            'changed_fields': changed_fields,
+            'report_dict': self._flatten_report(report),
         }
 
-        # Add all report fields except id and tracking fields specific to reports table
-        exclude_fields = {'id', 'first_seen_at', 'last_updated_at', 'version_count'}
-        for key, value in report_dict.items():
-            if key not in exclude_fields:
-                version_dict[key] = value
+    def flush_versions(self, staged: List[Dict[str, Any]]) -> List[int]:
+        """
+        Write staged versions to the database in a single transaction.
 
-        # Insert into report_versions
-        # Generate new version_id manually
-        max_vid_result = self.conn.execute("SELECT COALESCE(MAX(version_id), 0) FROM report_versions").fetchone()
-        version_id = (max_vid_result[0] if max_vid_result else 0) + 1
-        version_dict['version_id'] = version_id
+        New reports are inserted into the reports table, every version is
+        inserted into report_versions, and existing reports are updated to
+        point at their latest version. Each staged dict is updated in place
+        with the 'version_id' and 'version_number' it was written as.
 
-        fields = ', '.join(f'"{k}"' for k in version_dict.keys())
-        placeholders = ', '.join(['?' for _ in version_dict.keys()])
-        query = f"INSERT INTO report_versions ({fields}) VALUES ({placeholders})"
+        Args:
+            staged: Dicts returned by stage_version()
 
+        Returns:
+            Version IDs created, in the same order as staged
+        """
+        if not staged:
+            return []
+
+        conn = self.conn
         try:
-            self.conn.execute(query, list(version_dict.values()))
-
-            # Update reports table with current version
-            update_query = """
-                UPDATE reports
-                SET
-                    last_updated_at = ?,
-                    version_count = ?,
-                    content_hash = ?
-                WHERE id = ?
-            """
-            self.conn.execute(
-                update_query,
-                [
-                    report.scraped_at or datetime.utcnow(),
-                    version_number,
-                    report.content_hash,
-                    report_id
-                ]
-            )
-            self.conn.commit()
+            conn.begin()
+
+            # Read id state once per batch instead of once per report
+            report_ids = dict(conn.execute("SELECT slug, id FROM reports").fetchall())
+            latest_versions = dict(conn.execute(
+                "SELECT report_id, MAX(version_number) FROM report_versions GROUP BY report_id"
+            ).fetchall())
+            max_id_result = conn.execute("SELECT COALESCE(MAX(id), 0) FROM reports").fetchone()
+            next_report_id = max_id_result[0] + 1
+            max_vid_result = conn.execute("SELECT COALESCE(MAX(version_id), 0) FROM report_versions").fetchone()
+            next_version_id = max_vid_result[0] + 1
+
+            new_reports = []
+            versions = []
+            updates = []
+            version_ids = []
+
+            # Exclude tracking fields specific to the reports table
+            exclude_fields = {'id', 'first_seen_at', 'last_updated_at', 'version_count'}
+
+            for item in staged:
+                report = item['report']
+                report_dict = item['report_dict']
+                scraped_at = report.scraped_at or datetime.utcnow()
+
+                report_id = report_ids.get(report.slug)
+                is_new = report_id is None
+                if is_new:
+                    report_id = next_report_id
+                    next_report_id += 1
+                    report_ids[report.slug] = report_id
+
+                version_number = (latest_versions.get(report_id) or 0) + 1
+                latest_versions[report_id] = version_number
+
+                if is_new:
+                    # Insert the report already pointing at this version
+                    row = dict(report_dict)
+                    row['id'] = report_id
+                    row['first_seen_at'] = row.get('first_seen_at') or scraped_at
+                    row['last_updated_at'] = scraped_at
+                    row['scraped_at'] = scraped_at
+                    row['version_count'] = version_number
+                    new_reports.append(row)
+                else:
+                    updates.append([scraped_at, version_number, report.content_hash, report_id])
+
+                version_dict = {
+                    'version_id': next_version_id,
+                    'report_id': report_id,
+                    'version_number': version_number,
+                    'snapshot_reason': item['reason'],
+                    'changed_fields': json.dumps(item['changed_fields']) if item['changed_fields'] else None,
+                }
+                for key, value in report_dict.items():
+                    if key not in exclude_fields:
+                        version_dict[key] = value
+                version_dict['scraped_at'] = scraped_at
 
-            return version_id
+                versions.append(version_dict)
+                version_ids.append(next_version_id)
+                item['version_id'] = next_version_id
+                item['version_number'] = version_number
+                next_version_id += 1
+
+            self._insert_rows('reports', new_reports)
+            self._insert_rows('report_versions', versions)
+
+            if updates:
+                conn.executemany("""
+                    UPDATE reports
+                    SET
+                        last_updated_at = ?,
+                        version_count = ?,
+                        content_hash = ?
+                    WHERE id = ?
+                """, updates)
+
+            conn.commit()
+            return version_ids
 
         except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
             raise RuntimeError(f"Failed to create version: {e}")
 
+    def flush_versions_isolated(self, staged: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write staged versions in one transaction, falling back to one
+        transaction per version if the batch fails, so a single bad row
+        only loses its own report.
+
+        Args:
+            staged: Dicts returned by stage_version()
+
+        Returns:
+            Staged dicts that could not be written, each with an 'error' message
+        """
+        try:
+            self.flush_versions(staged)
+            return []
+        except RuntimeError:
+            pass
+
+        failed = []
+        for item in staged:
+            try:
+                self.flush_versions([item])
+            except RuntimeError as e:
+                # Drop the ids assigned before the rollback
+                item.pop('version_id', None)
+                item.pop('version_number', None)
+                item['error'] = str(e)
+                failed.append(item)
+
+        return failed
+
+    def _insert_rows(self, table: str, rows: List[Dict[str, Any]]):
+        """Insert dict rows sharing the same keys with a single executemany."""
+        if not rows:
+            return
+
+        fields = ', '.join(f'"{k}"' for k in rows[0].keys())
+        placeholders = ', '.join(['?' for _ in rows[0].keys()])
+        query = f"INSERT INTO {table} ({fields}) VALUES ({placeholders})"
+        self.conn.executemany(query, [list(row.values()) for row in rows])
+
     def update_report_table(self, report: Report, report_id: int):
         """
         Update the reports table with latest report data.
@@ -359,9 +495,7 @@ class VersionManager:
         if data.get('faq_questions_answers') and isinstance(data['faq_questions_answers'], str):
             try:
                 faq_data = json.loads(data['faq_questions_answers'])
-                data['faq_questions_answers'] = [
-                    type('FAQPair', (), faq)() for faq in faq_data
-                ]
+                data['faq_questions_answers'] = [FAQPair(**faq) for faq in faq_data]
             except:
                 data['faq_questions_answers'] = None
 
@@ -3,13 +3,26 @@ Pydantic models for Mordor Intelligence report data.
 Full schema for 153 payment market reports with versioning and change tracking.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 from decimal import Decimal
 import json
 import hashlib
 
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+
+# Tracking fields left out of the content hash and change detection
+TRACKING_FIELDS = frozenset({
+    'scraped_at', 'first_seen_at', 'last_updated_at',
+    'content_hash', 'version_count'
+})
+
 
 class MarketSize(BaseModel):
     """Market size with value, unit, year, and currency."""
@@ -104,10 +117,7 @@ class Report(BaseModel):
 
     def compute_content_hash(self) -> str:
         """Compute SHA256 hash of report content (excluding scraped_at and tracking fields)."""
-        content_dict = self.model_dump(exclude={
-            'scraped_at', 'first_seen_at', 'last_updated_at',
-            'content_hash', 'version_count'
-        })
+        content_dict = self.model_dump(exclude=set(TRACKING_FIELDS))
         # Convert to JSON with sorted keys for deterministic hashing
         content_json = json.dumps(content_dict, sort_keys=True, default=str)
         return hashlib.sha256(content_json.encode()).hexdigest()
@@ -118,10 +128,9 @@ class Report(BaseModel):
             return None
 
         changed = []
-        exclude_fields = {'scraped_at', 'first_seen_at', 'last_updated_at', 'content_hash', 'version_count'}
 
         for field in self.model_fields.keys():
-            if field in exclude_fields:
+            if field in TRACKING_FIELDS:
                 continue
 
             self_value = getattr(self, field)
@@ -133,6 +142,39 @@ class Report(BaseModel):
         return changed if changed else None
 
 
+# Built once at import; validates raw dicts (e.g. decoded JSON) into Reports
+_REPORT_ADAPTER = TypeAdapter(Report)
+validate_python = _REPORT_ADAPTER.validate_python
+
+
+if MSGSPEC_AVAILABLE:
+    class ReportStruct(msgspec.Struct, frozen=True):
+        """Report fields read by ReportValidator, for bulk validation paths."""
+        slug: str
+        title: str
+        url: str
+        market_size_current_value: Optional[float] = None
+        market_size_forecast_value: Optional[float] = None
+        cagr_percent: Optional[float] = None
+        fastest_growing_country_cagr: Optional[float] = None
+        study_period_start: Optional[int] = None
+        study_period_end: Optional[int] = None
+        major_players: Optional[List[str]] = None
+        leading_segment_share_percent: Optional[float] = None
+        cloud_share_percent: Optional[float] = None
+        leading_segment_name: Optional[str] = None
+        region: Optional[str] = None
+
+    def decode_report_struct(payload: bytes) -> 'ReportStruct':
+        """Decode and validate a report JSON payload (extra fields ignored)."""
+        # Non-strict so Decimal fields serialized as strings decode to floats
+        return msgspec.json.decode(payload, type=ReportStruct, strict=False)
+
+    def report_to_struct(report: Report) -> 'ReportStruct':
+        """Convert a Report to a ReportStruct."""
+        return msgspec.convert(report.__dict__, ReportStruct, strict=False)
+
+
 class ReportVersion(BaseModel):
     """Historical snapshot of a report at a specific version."""
     version_id: Optional[int] = None
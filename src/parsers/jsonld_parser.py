@@ -5,31 +5,99 @@ Extracts structured data from 5 JSON-LD blocks on each report page.
 
 import json
 import re
+import sys
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from typing import Optional, List, Dict, Any, Union
+from bs4 import BeautifulSoup, SoupStrainer
 
 from src.models.schema import Report, FAQPair
 from src.parsers import regex_patterns as rp
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+
+# JSON-LD script bodies, matched straight from the page without building a DOM
+JSONLD_SCRIPT_PATTERN = re.compile(
+    r'<script\b[^>]*\btype=["\']?application/ld\+json["\']?[^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+JSONLD_SCRIPT_PATTERN_BYTES = re.compile(
+    JSONLD_SCRIPT_PATTERN.pattern.encode(),
+    re.DOTALL | re.IGNORECASE
+)
+
+# Only the tags the title/description/image lookups (and the JSON-LD
+# fallback) need are kept in the soup
+_SOUP_TAGS = SoupStrainer(['meta', 'title', 'h1', 'script'])
+
+
+# datetime.fromisoformat accepts a trailing 'Z' from Python 3.11 onwards
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+
+def _parse_iso_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, handling a trailing 'Z' on older Pythons."""
+    if not _FROMISOFORMAT_ACCEPTS_Z and value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+# Empty-result templates for _parse_faq_page / _parse_dataset; always copied
+_EMPTY_FAQ_RESULT = {
+    'market_size_current_value': None,
+    'market_size_current_unit': None,
+    'market_size_current_year': None,
+    'market_size_forecast_value': None,
+    'market_size_forecast_unit': None,
+    'market_size_forecast_year': None,
+    'cagr_percent': None,
+    'region': None,
+    'fastest_growing_country': None,
+    'fastest_growing_country_cagr': None,
+    'leading_segment_name': None,
+    'leading_segment_share_percent': None,
+    'leading_segment_cagr': None,
+    'cloud_share_percent': None,
+    'major_players': None,
+    'faq_questions_answers': None,
+}
+
+_EMPTY_DATASET_RESULT = {
+    'temporal_coverage': None,
+    'spatial_coverage': None,
+    'study_period_start': None,
+    'study_period_end': None,
+}
+
 
 class JSONLDParser:
     """Parse JSON-LD structured data from payment market report HTML."""
 
-    def __init__(self, html: str, url: str):
+    def __init__(self, html: Union[str, bytes], url: str):
         """
         Initialize parser with HTML content and report URL.
 
         Args:
-            html: Complete HTML page content
+            html: Complete HTML page content, as str or raw response bytes
+                (BeautifulSoup detects the encoding of bytes input)
             url: Report URL for context
         """
         self.html = html
         self.url = url
-        self.soup = BeautifulSoup(html, 'html.parser')
+        self._soup = None
         self.jsonld_blocks = self._extract_jsonld_blocks()
 
+    @property
+    def soup(self) -> BeautifulSoup:
+        """Soup of the meta/title/h1/script tags, built on first use."""
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, 'html.parser', parse_only=_SOUP_TAGS)
+        return self._soup
+
     def _extract_jsonld_blocks(self) -> Dict[str, Dict[str, Any]]:
         """
         Extract all JSON-LD script blocks from HTML.
@@ -43,10 +111,18 @@ class JSONLDParser:
             'breadcrumb': None,
         }
 
-        scripts = self.soup.find_all('script', type='application/ld+json')
-        for script in scripts:
+        pattern = JSONLD_SCRIPT_PATTERN_BYTES if isinstance(self.html, bytes) else JSONLD_SCRIPT_PATTERN
+        sources = pattern.findall(self.html)
+        if not sources:
+            # Fall back to the DOM for markup the pattern does not recognise
+            sources = [
+                script.string
+                for script in self.soup.find_all('script', type='application/ld+json')
+            ]
+
+        for source in sources:
             try:
-                data = json.loads(script.string)
+                data = json_loads(source)
 
                 # Handle @type as either string or list
                 type_value = data.get('@type', '')
@@ -66,7 +142,7 @@ class JSONLDParser:
                 elif 'BreadcrumbList' in types:
                     blocks['breadcrumb'] = data
 
-            except (json.JSONDecodeError, ValueError):
+            except (ValueError, TypeError):
                 continue
 
         return blocks
@@ -75,9 +151,9 @@ class JSONLDParser:
         """
         Orchestrate parsing of all JSON-LD sources to build complete Report.
         """
-        # Extract slug from URL
-        parsed_url = urlparse(self.url)
-        slug = parsed_url.path.strip('/').split('/')[-1]
+        # Extract slug from URL (last path segment, ignoring query/fragment)
+        path = self.url.split('#', 1)[0].split('?', 1)[0]
+        slug = path.rstrip('/').rsplit('/', 1)[-1]
 
         # Parse metadata first
         title = self._parse_title()
@@ -146,23 +222,19 @@ class JSONLDParser:
         """Extract publication and modification dates from WebPage schema."""
         dates = {'published': None, 'modified': None}
 
-        if not self.jsonld_blocks['web_page']:
+        web_page = self.jsonld_blocks['web_page']
+        if not web_page:
             return dates
 
-        web_page = self.jsonld_blocks['web_page']
         try:
             if 'datePublished' in web_page:
-                dates['published'] = datetime.fromisoformat(
-                    web_page['datePublished'].replace('Z', '+00:00')
-                )
+                dates['published'] = _parse_iso_datetime(web_page['datePublished'])
         except (ValueError, KeyError):
             pass
 
         try:
             if 'dateModified' in web_page:
-                dates['modified'] = datetime.fromisoformat(
-                    web_page['dateModified'].replace('Z', '+00:00')
-                )
+                dates['modified'] = _parse_iso_datetime(web_page['dateModified'])
         except (ValueError, KeyError):
             pass
 
@@ -173,89 +245,91 @@ class JSONLDParser:
         Extract metrics from FAQPage JSON-LD.
         Returns dict with extracted metrics like market_size, cagr, players, etc.
         """
-        result = {
-            'market_size_current_value': None,
-            'market_size_current_unit': None,
-            'market_size_current_year': None,
-            'market_size_forecast_value': None,
-            'market_size_forecast_unit': None,
-            'market_size_forecast_year': None,
-            'cagr_percent': None,
-            'region': None,
-            'fastest_growing_country': None,
-            'fastest_growing_country_cagr': None,
-            'leading_segment_name': None,
-            'leading_segment_share_percent': None,
-            'leading_segment_cagr': None,
-            'cloud_share_percent': None,
-            'major_players': None,
-            'faq_questions_answers': None,
-        }
+        result = _EMPTY_FAQ_RESULT.copy()
 
-        if not self.jsonld_blocks['faq_page']:
+        faq_page = self.jsonld_blocks['faq_page']
+        if not faq_page:
             return result
 
-        faq_page = self.jsonld_blocks['faq_page']
         faq_items = faq_page.get('mainEntity', [])
         if not isinstance(faq_items, list):
             faq_items = [faq_items]
 
         # Parse FAQ items
         faq_pairs = []
-        combined_text = ""
+        text_parts = []
+
+        append_pair = faq_pairs.append
+        append_text = text_parts.append
 
         for item in faq_items:
-            if item.get('@type') != 'Question':
+            get = item.get
+            if get('@type') != 'Question':
                 continue
 
-            question = item.get('name', '')
-            answer_obj = item.get('acceptedAnswer', {})
+            question = get('name', '')
+            answer_obj = get('acceptedAnswer', {})
             answer_text = answer_obj.get('text', '') if answer_obj else ''
 
             if question and answer_text:
-                faq_pairs.append(FAQPair(question=question, answer=answer_text))
-                combined_text += f"\n{question}\n{answer_text}\n"
+                append_pair(FAQPair(question=question, answer=answer_text))
+                append_text(question)
+                append_text(answer_text)
 
         result['faq_questions_answers'] = faq_pairs if faq_pairs else None
 
         # Extract metrics from combined FAQ text
-        if combined_text:
+        if text_parts:
+            combined_text = '\n'.join(text_parts)
+
+            # Lowercase once for the extractors that only capture numbers;
+            # company names keep the original casing
+            lower_text = combined_text.lower()
+
+            # Cheap substring prechecks: market sizes need a
+            # billion/trillion/million unit and every percentage extractor
+            # needs a literal '%', so skip the regex scans when absent
+            has_units = 'illion' in lower_text
+            has_pct = '%' in combined_text
+
             # Market sizes (current and forecast)
-            sizes = rp.extract_all_market_sizes(combined_text)
-            if len(sizes) >= 1:
-                value, unit, year = sizes[0]
-                result['market_size_current_value'] = value
-                result['market_size_current_unit'] = unit
-                result['market_size_current_year'] = year
-
-            if len(sizes) >= 2:
-                value, unit, year = sizes[1]
-                result['market_size_forecast_value'] = value
-                result['market_size_forecast_unit'] = unit
-                result['market_size_forecast_year'] = year
-
-            # CAGR
-            cagrs = rp.extract_all_cagrs(combined_text)
-            if cagrs:
-                result['cagr_percent'] = cagrs[0]
-
-            # Fastest growing
-            country, cagr = rp.extract_fastest_growing(combined_text)
-            if country:
-                result['fastest_growing_country'] = country
-                result['fastest_growing_country_cagr'] = cagr
-
-            # Leading segment
-            seg_name, seg_share, seg_cagr = rp.extract_leading_segment(combined_text)
-            if seg_name:
-                result['leading_segment_name'] = seg_name
-                result['leading_segment_share_percent'] = seg_share
-                result['leading_segment_cagr'] = seg_cagr
-
-            # Cloud share
-            cloud = rp.extract_cloud_share(combined_text)
-            if cloud:
-                result['cloud_share_percent'] = cloud
+            if has_units:
+                sizes = rp.extract_all_market_sizes(lower_text, lowered=True)
+                if len(sizes) >= 1:
+                    value, unit, year = sizes[0]
+                    result['market_size_current_value'] = value
+                    result['market_size_current_unit'] = unit
+                    result['market_size_current_year'] = year
+
+                if len(sizes) >= 2:
+                    value, unit, year = sizes[1]
+                    result['market_size_forecast_value'] = value
+                    result['market_size_forecast_unit'] = unit
+                    result['market_size_forecast_year'] = year
+
+            if has_pct:
+                # CAGR
+                cagrs = rp.extract_all_cagrs(lower_text, lowered=True)
+                if cagrs:
+                    result['cagr_percent'] = cagrs[0]
+
+                # Fastest growing
+                country, cagr = rp.extract_fastest_growing(combined_text)
+                if country:
+                    result['fastest_growing_country'] = country
+                    result['fastest_growing_country_cagr'] = cagr
+
+                # Leading segment
+                seg_name, seg_share, seg_cagr = rp.extract_leading_segment(combined_text)
+                if seg_name:
+                    result['leading_segment_name'] = seg_name
+                    result['leading_segment_share_percent'] = seg_share
+                    result['leading_segment_cagr'] = seg_cagr
+
+                # Cloud share
+                cloud = rp.extract_cloud_share(lower_text, lowered=True)
+                if cloud:
+                    result['cloud_share_percent'] = cloud
 
             # Major players
             players = rp.extract_companies(combined_text)
@@ -266,29 +340,20 @@ class JSONLDParser:
             # Look for region keywords in first answer
             if faq_items:
                 first_answer = faq_items[0].get('acceptedAnswer', {}).get('text', '')
-                for region_name in [
-                    'Asia-Pacific', 'North America', 'Europe', 'South America',
-                    'Middle East', 'Africa', 'Latin America'
-                ]:
-                    if region_name.lower() in first_answer.lower():
-                        result['region'] = region_name
-                        break
+                region = rp.extract_region(first_answer)
+                if region:
+                    result['region'] = region
 
         return result
 
     def _parse_dataset(self) -> Dict[str, Any]:
         """Extract temporal and spatial coverage from Dataset schema."""
-        result = {
-            'temporal_coverage': None,
-            'spatial_coverage': None,
-            'study_period_start': None,
-            'study_period_end': None,
-        }
+        result = _EMPTY_DATASET_RESULT.copy()
 
-        if not self.jsonld_blocks['dataset']:
+        dataset = self.jsonld_blocks['dataset']
+        if not dataset:
             return result
 
-        dataset = self.jsonld_blocks['dataset']
 
         # Temporal coverage
         if 'temporalCoverage' in dataset:
@@ -314,32 +379,30 @@ class JSONLDParser:
     def _parse_images(self) -> Optional[List[str]]:
         """Extract image URLs from ImageObject or meta tags."""
         urls = []
+        seen = set()
+
+        def add(url):
+            if url and url not in seen:
+                seen.add(url)
+                urls.append(url)
 
         # From ImageObject
-        if self.jsonld_blocks['image_object']:
-            img_obj = self.jsonld_blocks['image_object']
+        img_obj = self.jsonld_blocks['image_object']
+        if img_obj:
             if isinstance(img_obj, list):
                 for item in img_obj:
-                    url = item.get('url')
-                    if url and url not in urls:
-                        urls.append(url)
+                    add(item.get('url'))
             else:
-                url = img_obj.get('url')
-                if url:
-                    urls.append(url)
+                add(img_obj.get('url'))
 
         # From og:image meta tags
         og_images = self.soup.find_all('meta', property='og:image')
         for og_img in og_images:
-            url = og_img.get('content')
-            if url and url not in urls:
-                urls.append(url)
+            add(og_img.get('content'))
 
         # From twitter:image
         twitter_images = self.soup.find_all('meta', attrs={'name': 'twitter:image'})
         for tw_img in twitter_images:
-            url = tw_img.get('content')
-            if url and url not in urls:
-                urls.append(url)
+            add(tw_img.get('content'))
 
         return urls if urls else None
@@ -4,7 +4,8 @@ Patterns extracted from FAQ answers and metadata fields.
 """
 
 import re
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from typing import Optional, Tuple
 from decimal import Decimal
 
 
@@ -14,18 +15,39 @@ MARKET_SIZE_PATTERN = re.compile(
     re.IGNORECASE
 )
 
+# Case-sensitive variant for text that is already lowercased
+MARKET_SIZE_PATTERN_LOWER = re.compile(
+    r'(?:usd|us\$|₹|\$)?\s*([0-9,]+(?:\.[0-9]{1,2})?)\s*(billion|trillion|million)\s*(?:in|by|as of)?\s*(?:(\d{4}))?'
+)
+
+# Captured unit text (common casings) -> canonical unit name
+UNIT_MAP = {
+    variant: unit.capitalize()
+    for unit in ('billion', 'trillion', 'million')
+    for variant in (unit, unit.upper(), unit.capitalize())
+}
+
 # CAGR patterns: "5.51% CAGR" or "CAGR of 5.51%"
 CAGR_PATTERN = re.compile(
     r'(?:CAGR\s+(?:of\s+)?|Compound Annual Growth Rate\s+(?:of\s+)?)?([0-9.]+)%\s*(?:CAGR)?',
     re.IGNORECASE
 )
 
+# Case-sensitive variant for text that is already lowercased
+CAGR_PATTERN_LOWER = re.compile(
+    r'(?:cagr\s+(?:of\s+)?|compound annual growth rate\s+(?:of\s+)?)?([0-9.]+)%\s*(?:cagr)?'
+)
+
 # Company names: "Mastercard Inc.", "Visa Ltd.", etc.
 # Matches company name followed by Inc., Ltd., LLC, Corp., Corporation, Limited, Incorporated
 COMPANY_PATTERN = re.compile(
     r'\b([A-Z][A-Za-z&\-]*(?:\s+[A-Z][A-Za-z&\-]*)*)\s+(Inc\.?|Ltd\.?|LLC|Corp\.?|Corporation|Limited|Incorporated)\b'
 )
 
+# Literal pre-filter for COMPANY_PATTERN: every suffix contains one of
+# these ("Incorporated" contains "Inc", "Corporation" contains "Corp")
+COMPANY_SUFFIX_LITERALS = ('Inc', 'Ltd', 'LLC', 'Corp', 'Limited')
+
 # Country + CAGR: "Colombia (7.41% CAGR)" or "India at 15.3% CAGR"
 COUNTRY_CAGR_PATTERN = re.compile(
     r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s*(?:at|with|@)?\s*\(?([0-9.]+)%\s*(?:CAGR)?\)?',
@@ -34,16 +56,25 @@ COUNTRY_CAGR_PATTERN = re.compile(
 
 # Leading segment: "Retail (33.67%, 6.27% CAGR)"
 LEADING_SEGMENT_PATTERN = re.compile(
-    r'(?:leading|top|largest)\s+(?:segment|type|category|channel).*?(?:is|:)?\s*([A-Z][A-Za-z\s&\-]+?)\s*\(?([0-9.]+)%(?:.*?([0-9.]+)%\s*CAGR)?\)?',
+    r'(?:leading|top|largest)\s+(?:segment|type|category|channel).{0,120}?(?:is|:)?\s*([A-Z][A-Za-z\s&\-]+?)\s*\(?([0-9.]+)%(?:.{0,120}?([0-9.]+)%\s*CAGR)?\)?',
     re.IGNORECASE
 )
 
+# Trigger words checked before the leading-segment regex (no lowercased copy)
+LEADING_SEGMENT_TRIGGER = re.compile(r'leading|top|largest', re.IGNORECASE)
+
 # Cloud share: "68.34% of the market" or "Cloud deployments accounted for 68.34%"
 CLOUD_SHARE_PATTERN = re.compile(
     r'cloud(?:\s+based)?(?:\s+deployment)?s?\s+(?:accounted\s+for|represent|held|account\s+for).*?([0-9.]+)%',
     re.IGNORECASE | re.DOTALL
 )
 
+# Case-sensitive variant for text that is already lowercased
+CLOUD_SHARE_PATTERN_LOWER = re.compile(
+    r'cloud(?:\s+based)?(?:\s+deployment)?s?\s+(?:accounted\s+for|represent|held|account\s+for).*?([0-9.]+)%',
+    re.DOTALL
+)
+
 # Study period: "2022-2031" or "from 2022 to 2031"
 STUDY_PERIOD_PATTERN = re.compile(
     r'(?:from|during|over|in)?\s*(\d{4})\s*(?:to|through|-)\s*(\d{4})',
@@ -52,17 +83,74 @@ STUDY_PERIOD_PATTERN = re.compile(
 
 # Fastest growing country/region: "fastest growing at 12.3%" or "highest CAGR 12.3%"
 FASTEST_GROWING_PATTERN = re.compile(
-    r'(?:fastest\s+growing|highest\s+(?:growth|CAGR)|most\s+rapidly\s+growing).*?\b(?:is\s+)?([A-Z][a-z]+)\s+(?:at|@|with)\s*\(?([0-9.]+)%',
+    r'(?:fastest\s+growing|highest\s+(?:growth|CAGR)|most\s+rapidly\s+growing).{0,120}?\b(?:is\s+)?([A-Z][a-z]+)\s+(?:at|@|with)\s*\(?([0-9.]+)%',
     re.IGNORECASE | re.DOTALL
 )
 
+# Trigger words checked before the fastest-growing regex (no lowercased copy)
+FASTEST_GROWING_TRIGGER = re.compile(r'fastest|highest|rapidly', re.IGNORECASE)
+
 # Temporal coverage: "2015-2025" or "2020-2030"
 TEMPORAL_COVERAGE_PATTERN = re.compile(
     r'(?:temporal\s+coverage|time\s+period|study\s+period).*?(\d{4})\s*(?:to|through|-)\s*(\d{4})',
     re.IGNORECASE
 )
 
+# Region names: "Asia-Pacific", "North America", etc.
+REGION_PATTERN = re.compile(
+    r'(Asia-Pacific|North America|Europe|South America|Middle East|Africa|Latin America)',
+    re.IGNORECASE
+)
 
+# Lowercased region match -> canonical region name
+REGION_CANONICAL = {
+    'asia-pacific': 'Asia-Pacific',
+    'north america': 'North America',
+    'europe': 'Europe',
+    'south america': 'South America',
+    'middle east': 'Middle East',
+    'africa': 'Africa',
+    'latin america': 'Latin America',
+}
+
+# Priority when several regions are mentioned (REGION_CANONICAL order)
+REGION_PRIORITY = {name: i for i, name in enumerate(REGION_CANONICAL)}
+REGION_CANONICAL_NAMES = tuple(REGION_CANONICAL.values())
+
+# Bare percentage: "45.67%"
+PERCENTAGE_PATTERN = re.compile(r'([0-9.]+)%', re.IGNORECASE)
+
+# Year: 4-digit number in the 2000s
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+
+# Currency codes and symbols mapped to ISO codes
+CURRENCY_MAP = {
+    '$': 'USD',
+    '€': 'EUR',
+    '£': 'GBP',
+    '¥': 'JPY',
+    '₹': 'INR',
+    'USD': 'USD',
+    'EUR': 'EUR',
+    'GBP': 'GBP',
+    'JPY': 'JPY',
+    'INR': 'INR',
+}
+
+
+# Extractor results are memoized per input string so repeated FAQ text
+# across pages is only scanned once. List-valued extractors return tuples
+# so cached results cannot be mutated by callers.
+EXTRACT_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=128)
+def _labeled_percentage_pattern(label: str) -> re.Pattern:
+    """Compile (once per label) a pattern matching a percentage after a label."""
+    return re.compile(rf'{re.escape(label)}.*?([0-9.]+)%', re.IGNORECASE)
+
+
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_market_sizes(text: str) -> Tuple[Optional[Decimal], Optional[str], Optional[int]]:
     """
     Extract market size value, unit, and year from text.
@@ -81,30 +169,38 @@ def extract_market_sizes(text: str) -> Tuple[Optional[Decimal], Optional[str], O
     except:
         return None, None, None
 
-    unit = match.group(2).lower().capitalize()
+    raw_unit = match.group(2)
+    unit = UNIT_MAP.get(raw_unit) or raw_unit.capitalize()
     year = int(match.group(3)) if match.group(3) else None
 
     return value, unit, year
 
 
-def extract_all_market_sizes(text: str) -> List[Tuple[Decimal, str, int]]:
-    """Extract all market sizes from text (current and forecast)."""
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_all_market_sizes(text: str, lowered: bool = False) -> Tuple[Tuple[Decimal, str, int], ...]:
+    """
+    Extract all market sizes from text (current and forecast).
+    Pass lowered=True when text is already lowercased to skip case folding.
+    """
+    pattern = MARKET_SIZE_PATTERN_LOWER if lowered else MARKET_SIZE_PATTERN
     results = []
-    for match in MARKET_SIZE_PATTERN.finditer(text):
+    for match in pattern.finditer(text):
         value_str = match.group(1).replace(',', '')
         try:
             value = Decimal(value_str)
         except:
             continue
 
-        unit = match.group(2).lower().capitalize()
+        raw_unit = match.group(2)
+        unit = UNIT_MAP.get(raw_unit) or raw_unit.capitalize()
         year = int(match.group(3)) if match.group(3) else None
 
         results.append((value, unit, year))
 
-    return results
+    return tuple(results)
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_cagr(text: str) -> Optional[Decimal]:
     """Extract CAGR percentage from text."""
     if not text:
@@ -120,33 +216,46 @@ def extract_cagr(text: str) -> Optional[Decimal]:
         return None
 
 
-def extract_all_cagrs(text: str) -> List[Decimal]:
-    """Extract all CAGR values from text."""
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_all_cagrs(text: str, lowered: bool = False) -> Tuple[Decimal, ...]:
+    """
+    Extract all CAGR values from text.
+    Pass lowered=True when text is already lowercased to skip case folding.
+    """
+    pattern = CAGR_PATTERN_LOWER if lowered else CAGR_PATTERN
     results = []
-    for match in CAGR_PATTERN.finditer(text):
+    for match in pattern.finditer(text):
         try:
             results.append(Decimal(match.group(1)))
         except:
             continue
-    return results
+    return tuple(results)
 
 
-def extract_companies(text: str) -> List[str]:
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_companies(text: str) -> Tuple[str, ...]:
     """Extract company names from text."""
     if not text:
-        return []
+        return ()
+
+    # Skip the full regex scan when no company suffix appears at all
+    if not any(suffix in text for suffix in COMPANY_SUFFIX_LITERALS):
+        return ()
 
     companies = []
+    seen = set()
     for match in COMPANY_PATTERN.finditer(text):
         # Combine name (group 1) and suffix (group 2)
         company = f"{match.group(1)} {match.group(2)}".strip()
         # Avoid duplicates
-        if company not in companies:
+        if company not in seen:
+            seen.add(company)
             companies.append(company)
 
-    return companies
+    return tuple(companies)
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_fastest_growing(text: str) -> Optional[Tuple[str, Decimal]]:
     """
     Extract fastest growing country and its CAGR.
@@ -155,6 +264,10 @@ def extract_fastest_growing(text: str) -> Optional[Tuple[str, Decimal]]:
     if not text:
         return None, None
 
+    # Fail fast before the lazy-gap regex when no trigger word is present
+    if not FASTEST_GROWING_TRIGGER.search(text):
+        return None, None
+
     match = FASTEST_GROWING_PATTERN.search(text)
     if not match:
         return None, None
@@ -168,6 +281,7 @@ def extract_fastest_growing(text: str) -> Optional[Tuple[str, Decimal]]:
     return country, cagr if country else (None, None)
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_leading_segment(text: str) -> Optional[Tuple[str, Optional[Decimal], Optional[Decimal]]]:
     """
     Extract leading segment name, share percentage, and CAGR.
@@ -176,6 +290,10 @@ def extract_leading_segment(text: str) -> Optional[Tuple[str, Optional[Decimal],
     if not text:
         return None, None, None
 
+    # Fail fast before the lazy-gap regex when no trigger word is present
+    if not LEADING_SEGMENT_TRIGGER.search(text):
+        return None, None, None
+
     match = LEADING_SEGMENT_PATTERN.search(text)
     if not match:
         return None, None, None
@@ -194,12 +312,17 @@ def extract_leading_segment(text: str) -> Optional[Tuple[str, Optional[Decimal],
     return name, share, cagr
 
 
-def extract_cloud_share(text: str) -> Optional[Decimal]:
-    """Extract cloud share percentage from text."""
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_cloud_share(text: str, lowered: bool = False) -> Optional[Decimal]:
+    """
+    Extract cloud share percentage from text.
+    Pass lowered=True when text is already lowercased to skip case folding.
+    """
     if not text:
         return None
 
-    match = CLOUD_SHARE_PATTERN.search(text)
+    pattern = CLOUD_SHARE_PATTERN_LOWER if lowered else CLOUD_SHARE_PATTERN
+    match = pattern.search(text)
     if not match:
         return None
 
@@ -209,6 +332,7 @@ def extract_cloud_share(text: str) -> Optional[Decimal]:
         return None
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_study_period(text: str) -> Optional[Tuple[int, int]]:
     """
     Extract study period start and end years.
@@ -229,6 +353,31 @@ def extract_study_period(text: str) -> Optional[Tuple[int, int]]:
         return None, None
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_region(text: str) -> Optional[str]:
+    """
+    Extract the highest-priority region mentioned in text, in canonical casing.
+
+    When several regions appear, the one earliest in REGION_CANONICAL wins,
+    regardless of its position in the text.
+    """
+    if not text:
+        return None
+
+    best = None
+    for match in REGION_PATTERN.finditer(text):
+        priority = REGION_PRIORITY[match.group(1).lower()]
+        if best is None or priority < best:
+            best = priority
+            if priority == 0:
+                break
+
+    if best is None:
+        return None
+    return REGION_CANONICAL_NAMES[best]
+
+
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_percentage(text: str, label: str = None) -> Optional[Decimal]:
     """
     Extract a percentage from text, optionally with a label prefix.
@@ -237,11 +386,9 @@ def extract_percentage(text: str, label: str = None) -> Optional[Decimal]:
     if not text:
         return None
 
-    pattern = r'([0-9.]+)%'
-    if label:
-        pattern = f'{re.escape(label)}.*?({pattern})'
+    pattern = _labeled_percentage_pattern(label) if label else PERCENTAGE_PATTERN
 
-    match = re.search(pattern, text, re.IGNORECASE)
+    match = pattern.search(text)
     if not match:
         return None
 
@@ -251,12 +398,13 @@ def extract_percentage(text: str, label: str = None) -> Optional[Decimal]:
         return None
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_year(text: str) -> Optional[int]:
     """Extract a year (4-digit number) from text."""
     if not text:
         return None
 
-    match = re.search(r'\b(20\d{2})\b', text)
+    match = YEAR_PATTERN.search(text)
     if not match:
         return None
 
@@ -266,43 +414,34 @@ def extract_year(text: str) -> Optional[int]:
         return None
 
 
-def extract_all_years(text: str) -> List[int]:
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_all_years(text: str) -> Tuple[int, ...]:
     """Extract all years (4-digit numbers) from text."""
     if not text:
-        return []
+        return ()
 
     years = []
-    for match in re.finditer(r'\b(20\d{2})\b', text):
+    seen = set()
+    for match in YEAR_PATTERN.finditer(text):
         try:
             year = int(match.group(1))
-            if year not in years:
+            if year not in seen:
+                seen.add(year)
                 years.append(year)
         except:
             continue
 
-    return years
+    return tuple(years)
 
 
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
 def extract_currency(text: str) -> Optional[str]:
     """Extract currency code from text (USD, EUR, INR, GBP, etc.)."""
     if not text:
         return None
 
     # Look for ISO currency codes or symbols
-    currency_map = {
-        '$': 'USD',
-        '€': 'EUR',
-        '£': 'GBP',
-        '¥': 'JPY',
-        '₹': 'INR',
-        'USD': 'USD',
-        'EUR': 'EUR',
-        'GBP': 'GBP',
-        'JPY': 'JPY',
-        'INR': 'INR',
-    }
-
-    for symbol, code in currency_map.items():
+    for symbol, code in CURRENCY_MAP.items():
         if symbol in text:
             return code
 
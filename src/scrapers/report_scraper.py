@@ -5,15 +5,16 @@ Fetches, parses, detects changes, and stores to DuckDB with versioning.
 
 import asyncio
 import httpx
+import time
 import uuid
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
 import json
 
 from config.settings import (
     BASE_DIR, DATA_DIR, RAW_DIR, PROCESSED_DIR,
-    USER_AGENT, REQUEST_DELAY, DB_PATH
+    USER_AGENT, REQUESTS_PER_SECOND, DB_PATH
 )
 
 from src.models.schema import Report, ScrapeLogEntry
@@ -21,6 +22,54 @@ from src.parsers.jsonld_parser import JSONLDParser
 from src.database.versioning import VersionManager
 from src.scrapers.url_discovery import discover_all_report_urls
 
+try:
+    import brotli  # noqa: F401 - lets httpx decode 'br' responses
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 - required for httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Report pages are large and highly compressible; httpx decodes transparently
+ACCEPT_ENCODING = 'br, gzip, deflate' if BROTLI_AVAILABLE else 'gzip, deflate'
+
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=str, indent=2 if indent else None).encode('utf-8')
+
+
+class RateLimiter:
+    """Space request starts at least 1/rate seconds apart across all tasks."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Wait for this task's start slot."""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
 
 class ReportScraper:
     """Scrape payment market reports with versioning and change detection."""
@@ -50,14 +99,24 @@ class ReportScraper:
             'no_changes': 0,
         }
 
-    def _create_directories(self):
-        """Create necessary data directories."""
-        for dir_path in [RAW_DIR, PROCESSED_DIR]:
-            dir_path.mkdir(parents=True, exist_ok=True)
+        # Current reports table keyed by slug, loaded once per run
+        self._current_snapshot: Optional[Dict[str, Dict[str, Any]]] = None
 
-        # Create date-based subdirectory
-        date_str = datetime.now().strftime('%Y-%m')
-        (RAW_DIR / date_str).mkdir(parents=True, exist_ok=True)
+        # Versions staged by scrape_report, written in one batch per run
+        self._staged_versions: List[Dict[str, Any]] = []
+        # (staged version, log entry) pairs, updated once the batch is written
+        self._version_log_entries: List[Tuple[Dict[str, Any], ScrapeLogEntry]] = []
+
+        # Scrape log entries buffered until the end of the run
+        self._log_buffer: List[ScrapeLogEntry] = []
+        # Next scrape_log id, read from the table once and incremented locally
+        self._next_log_id: Optional[int] = None
+
+    def _create_directories(self):
+        """Create necessary data directories once per run."""
+        # Date-based raw HTML directory for this run (parents created too)
+        self._raw_dir = RAW_DIR / self.start_time.strftime('%Y-%m')
+        self._raw_dir.mkdir(parents=True, exist_ok=True)
         (PROCESSED_DIR / 'runs').mkdir(parents=True, exist_ok=True)
 
     async def run_full_scrape(self, max_concurrent: int = 5) -> Dict[str, Any]:
@@ -72,39 +131,66 @@ class ReportScraper:
         """
         print(f"Starting full scrape (run_id: {self.run_id})")
 
-        # Discover URLs
-        try:
-            urls = await discover_all_report_urls()
-            self.stats['total_urls'] = len(urls)
-            print(f"Found {len(urls)} report URLs")
-        except Exception as e:
-            print(f"ERROR discovering URLs: {e}")
-            return self.stats
-
-        # Scrape reports concurrently
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        # One client (and connection pool) for discovery and report fetches
+        limits = httpx.Limits(
+            max_connections=max_concurrent,
+            max_keepalive_connections=max_concurrent,
+            keepalive_expiry=60.0,
+        )
+        # HTTP/2 multiplexes concurrent fetches over one TLS connection
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=30.0,
+            limits=limits,
+            headers={'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING},
+        ) as client:
+            # Discover URLs
+            try:
+                urls = await discover_all_report_urls(client)
+                self.stats['total_urls'] = len(urls)
+                print(f"Found {len(urls)} report URLs")
+            except Exception as e:
+                print(f"ERROR discovering URLs: {e}")
+                return self.stats
+
+            # Load existing report state once instead of querying per report
+            try:
+                self._current_snapshot = self.version_manager.load_current_snapshot()
+            except Exception as e:
+                print(f"Warning: Failed to load report snapshot, querying per report: {e}")
+                self._current_snapshot = None
+
+            # Scrape reports concurrently; the semaphore caps in-flight requests
+            # and the rate limiter paces request starts independently
             semaphore = asyncio.Semaphore(max_concurrent)
+            rate_limiter = RateLimiter(REQUESTS_PER_SECOND)
 
             tasks = [
-                self._scrape_report_with_semaphore(client, url, semaphore)
+                self._scrape_report_with_semaphore(client, url, semaphore, rate_limiter)
                 for url in urls
             ]
 
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Each task returns a tagged (kind, payload) tuple and never raises
+            results = await asyncio.gather(*tasks)
+
+        # Write staged versions first, so reports whose version could not be
+        # saved are counted as errors below
+        failed = {id(staged['report']) for staged in self._flush_staged_versions()}
 
         # Process results
         parsed_reports = []
-        for result in results:
-            if isinstance(result, Exception):
+        for kind, payload in results:
+            if kind == 'ok' and id(payload) not in failed:
+                parsed_reports.append(payload)
+                self.stats['successful'] += 1
+            elif kind != 'skip':
                 self.stats['errors'] += 1
-                continue
 
-            if result:
-                parsed_reports.append(result)
-                self.stats['successful'] += 1
+        # Write buffered scrape log entries in one batch
+        self._flush_log_entries()
 
         # Save processed data
-        self._save_processed_reports(parsed_reports)
+        await asyncio.to_thread(self._save_processed_reports, parsed_reports)
 
         # Print summary
         print(f"\nScrape complete:")
@@ -120,12 +206,24 @@ class ReportScraper:
         self,
         client: httpx.AsyncClient,
         url: str,
-        semaphore: asyncio.Semaphore
-    ) -> Optional[Report]:
-        """Scrape report with semaphore for rate limiting."""
-        async with semaphore:
-            await asyncio.sleep(REQUEST_DELAY)
-            return await self.scrape_report(client, url)
+        semaphore: asyncio.Semaphore,
+        rate_limiter: RateLimiter
+    ) -> Tuple[str, Any]:
+        """
+        Scrape report with semaphore for concurrency and rate limiter for pacing.
+
+        Returns:
+            ('ok', report) for a new version, ('skip', None) when nothing was
+            written, or ('err', exception) if scraping raised
+        """
+        try:
+            async with semaphore:
+                await rate_limiter.wait()
+                report = await self.scrape_report(client, url)
+        except Exception as e:
+            return ('err', e)
+
+        return ('ok', report) if report else ('skip', None)
 
     async def scrape_report(self, client: httpx.AsyncClient, url: str) -> Optional[Report]:
         """
@@ -138,15 +236,18 @@ class ReportScraper:
         Returns:
             Parsed Report instance or None on error
         """
+        # Read the wall clock once (naive UTC, like the stored timestamps)
+        # and time everything else with the monotonic perf counter
+        started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        start = time.perf_counter()
+
         log_entry = ScrapeLogEntry(
             run_id=self.run_id,
             report_url=url,
             status='pending',
-            started_at=datetime.utcnow(),
+            started_at=started_at,
         )
 
-        start_time = datetime.utcnow()
-
         try:
             # Fetch HTML
             response = await client.get(
@@ -155,41 +256,49 @@ class ReportScraper:
             )
             response.raise_for_status()
 
-            response_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+            response_time_ms = int((time.perf_counter() - start) * 1000)
+            # response.content is already decompressed, so this is the HTML size
             html_size = len(response.content)
 
             log_entry.http_status_code = response.status_code
             log_entry.response_time_ms = response_time_ms
             log_entry.html_size_bytes = html_size
 
-            # Save raw HTML
-            self._save_raw_html(url, response.text)
+            # Save raw HTML (off the event loop)
+            await self._save_raw_html(url, response.content, started_at)
 
-            # Parse report
-            parser = JSONLDParser(response.text, url)
+            # Parse report straight from the response bytes (no str copy)
+            parser = JSONLDParser(response.content, url)
             report = parser.parse_report()
-            report.scraped_at = datetime.utcnow()
+            report.scraped_at = started_at
 
             log_entry.report_slug = report.slug
             log_entry.fields_extracted = self._count_non_none_fields(report)
 
             # Check for changes
-            should_create, reason, changed_fields = self.version_manager.should_create_version(report)
+            should_create, reason, changed_fields = self.version_manager.should_create_version(
+                report, self._current_snapshot
+            )
 
             if should_create:
-                # Create version
-                self.version_manager.create_version(report, reason, changed_fields)
+                # Stage version; all staged versions are written after gather
+                staged = self.version_manager.stage_version(report, reason, changed_fields)
+                self._staged_versions.append(staged)
 
                 log_entry.version_created = True
                 log_entry.fields_changed = len(changed_fields) if changed_fields else 0
 
+                # Entry is rewritten once the batch is written (or fails)
+                self._version_log_entries.append((staged, log_entry))
+
                 if reason == "new_report":
                     self.stats['new_reports'] += 1
                     log_entry.status = 'success'
                     log_entry.status_message = f"New report created"
                 else:
                     log_entry.status = 'success'
-                    log_entry.status_message = f"Version {self.version_manager._get_next_version_number(self.version_manager._get_or_create_report_id(report))-1} created"
+                    # Message gets the version number once the batch is written
+                    log_entry.status_message = "New version created"
                     self.stats['versions_created'] += 1
             else:
                 self.stats['no_changes'] += 1
@@ -224,24 +333,21 @@ class ReportScraper:
             return None
 
         finally:
-            log_entry.completed_at = datetime.utcnow()
-            log_entry.duration_seconds = (
-                log_entry.completed_at - log_entry.started_at
-            ).total_seconds()
+            elapsed = time.perf_counter() - start
+            log_entry.completed_at = started_at + timedelta(seconds=elapsed)
+            log_entry.duration_seconds = elapsed
 
-    def _save_raw_html(self, url: str, html: str):
-        """Save raw HTML to data/raw/ for audit trail."""
+    async def _save_raw_html(self, url: str, html: bytes, fetched_at: datetime):
+        """Save raw HTML bytes to data/raw/ for audit trail, in a worker thread."""
         # Extract slug from URL
         slug = url.rstrip('/').split('/')[-1]
-        date_str = datetime.now().strftime('%Y-%m')
-        date_prefix = datetime.now().strftime('%Y%m%d')
+        date_prefix = fetched_at.strftime('%Y%m%d')
 
-        file_path = RAW_DIR / date_str / f"{slug}_{date_prefix}.html"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # The run's raw directory already exists (see _create_directories)
+        file_path = self._raw_dir / f"{slug}_{date_prefix}.html"
 
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            await asyncio.to_thread(file_path.write_bytes, html)
         except Exception as e:
             print(f"Warning: Failed to save raw HTML for {slug}: {e}")
 
@@ -256,9 +362,8 @@ class ReportScraper:
         # Save as JSONL
         jsonl_file = run_dir / 'reports.jsonl'
         try:
-            with open(jsonl_file, 'w', encoding='utf-8') as f:
-                for report in reports:
-                    f.write(json.dumps(report.model_dump(mode='json'), default=str) + '\n')
+            lines = [_dumps(report.model_dump(mode='json')) for report in reports]
+            jsonl_file.write_bytes(b'\n'.join(lines) + b'\n')
         except Exception as e:
             print(f"Warning: Failed to save processed reports: {e}")
 
@@ -271,21 +376,69 @@ class ReportScraper:
                 'total_reports': len(reports),
                 'stats': self.stats
             }
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, default=str)
+            summary_file.write_bytes(_dumps(summary, indent=True))
         except Exception as e:
             print(f"Warning: Failed to save summary: {e}")
 
+    def _flush_staged_versions(self) -> List[Dict[str, Any]]:
+        """
+        Write all staged versions to the database, in a single transaction
+        unless a bad row forces per-version writes.
+
+        Log entries and stats of versions that could not be written are
+        rewritten as errors.
+
+        Returns:
+            Staged dicts that could not be written
+        """
+        if not self._staged_versions:
+            return []
+
+        failed = self.version_manager.flush_versions_isolated(self._staged_versions)
+        if failed:
+            print(f"Warning: Failed to save {len(failed)} version(s)")
+
+        for staged, entry in self._version_log_entries:
+            if 'error' in staged:
+                entry.status = 'error'
+                entry.error_type = 'db_error'
+                entry.status_message = staged['error']
+                entry.version_created = False
+                if staged['reason'] == 'new_report':
+                    self.stats['new_reports'] -= 1
+                else:
+                    self.stats['versions_created'] -= 1
+            elif staged['reason'] != 'new_report':
+                entry.status_message = f"Version {staged['version_number']} created"
+
+        self._staged_versions.clear()
+        self._version_log_entries.clear()
+        return failed
+
     def _save_log_entry(self, entry: ScrapeLogEntry):
-        """Save log entry to scrape_log table."""
+        """Buffer log entry for the scrape_log table (see _flush_log_entries)."""
+        self._log_buffer.append(entry)
+
+    def _flush_log_entries(self):
+        """
+        Insert all buffered log entries into scrape_log in a single batch.
+
+        The batch runs in one transaction, so it is committed once per run
+        and a failure part-way through leaves no partial rows behind.
+        """
+        if not self._log_buffer:
+            return
+
+        conn = self.version_manager.conn
         try:
-            # Generate log_id manually (max id + 1)
-            max_id_result = self.version_manager.conn.execute(
-                "SELECT COALESCE(MAX(log_id), 0) FROM scrape_log"
-            ).fetchone()
-            log_id = (max_id_result[0] if max_id_result else 0) + 1
+            # Generate log_ids manually (max id + 1), scanning only once per scraper
+            if self._next_log_id is None:
+                max_id_result = conn.execute(
+                    "SELECT COALESCE(MAX(log_id), 0) FROM scrape_log"
+                ).fetchone()
+                self._next_log_id = (max_id_result[0] if max_id_result else 0) + 1
+            next_id = self._next_log_id
 
-            # Insert into database
             query = """
                 INSERT INTO scrape_log
                 (log_id, run_id, report_url, report_slug, status, status_message, error_type,
@@ -295,37 +448,45 @@ class ReportScraper:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """
 
-            self.version_manager.conn.execute(query, [
-                log_id,
-                entry.run_id,
-                entry.report_url,
-                entry.report_slug,
-                entry.status,
-                entry.status_message,
-                entry.error_type,
-                entry.http_status_code,
-                entry.response_time_ms,
-                entry.html_size_bytes,
-                entry.fields_extracted,
-                entry.fields_changed,
-                entry.version_created,
-                entry.started_at,
-                entry.completed_at,
-                entry.duration_seconds,
-                entry.retry_count,
-            ])
-            self.version_manager.conn.commit()
+            rows = [
+                [
+                    next_id + offset,
+                    entry.run_id,
+                    entry.report_url,
+                    entry.report_slug,
+                    entry.status,
+                    entry.status_message,
+                    entry.error_type,
+                    entry.http_status_code,
+                    entry.response_time_ms,
+                    entry.html_size_bytes,
+                    entry.fields_extracted,
+                    entry.fields_changed,
+                    entry.version_created,
+                    entry.started_at,
+                    entry.completed_at,
+                    entry.duration_seconds,
+                    entry.retry_count,
+                ]
+                for offset, entry in enumerate(self._log_buffer)
+            ]
+
+            conn.begin()
+            conn.executemany(query, rows)
+            conn.commit()
+            self._next_log_id = next_id + len(rows)
+            self._log_buffer.clear()
 
         except Exception as e:
-            print(f"Warning: Failed to save log entry: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            print(f"Warning: Failed to save log entries: {e}")
 
     def _count_non_none_fields(self, report: Report) -> int:
         """Count non-None fields in report."""
-        count = 0
-        for field in report.model_fields.keys():
-            if getattr(report, field) is not None:
-                count += 1
-        return count
+        return len(report.model_dump(exclude_none=True))
 
 
 async def run_scrape():
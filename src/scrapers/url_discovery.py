@@ -4,12 +4,11 @@ Uses Playwright for JavaScript rendering to get all reports including paginated
 """
 
 import json
-import re
 import httpx
-from typing import List, Set
-from urllib.parse import urljoin, urlparse
+from typing import List, Optional, Set
+from urllib.parse import urljoin
 
-from config.settings import BASE_URL, PAYMENTS_INDEX, USER_AGENT, REQUEST_DELAY
+from config.settings import BASE_URL, PAYMENTS_INDEX, REPORT_PREFIX, USER_AGENT
 import asyncio
 
 try:
@@ -18,13 +17,60 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# Report links on the rendered index page
+REPORT_LINK_SELECTOR = 'a[href*="/industry-reports/"]'
+
+# Link count at which the full payments listing (~153 reports) is loaded
+PLAYWRIGHT_LINK_TARGET = 150
+
+# Scrolls to the bottom and resolves with the link count once new links stop
+# arriving (quietMs after the last one) or after timeoutMs with no growth.
+# A MutationObserver drives this, so there is no polling or fixed sleep.
+SCROLL_AND_WAIT_JS = """
+([selector, quietMs, timeoutMs]) => new Promise(resolve => {
+    const count = () => document.querySelectorAll(selector).length;
+    const initial = count();
+    let quiet = null;
+    const finish = () => {
+        observer.disconnect();
+        clearTimeout(quiet);
+        clearTimeout(cap);
+        resolve(count());
+    };
+    const observer = new MutationObserver(() => {
+        if (count() > initial) {
+            clearTimeout(quiet);
+            quiet = setTimeout(finish, quietMs);
+        }
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+    const cap = setTimeout(finish, timeoutMs);
+    window.scrollTo(0, document.body.scrollHeight);
+})
+"""
+
+# Start of the Next.js data script tag; the JSON payload follows the tag's '>'.
+# Located with plain bytes.find scans, which are linear-time by construction.
+NEXT_DATA_OPEN = b'<script id="__NEXT_DATA__"'
+NEXT_DATA_END = b'</script>'
+
 
-async def discover_all_report_urls() -> List[str]:
+async def discover_all_report_urls(client: Optional[httpx.AsyncClient] = None) -> List[str]:
     """
     Discover payment market report URLs using Playwright for JavaScript rendering.
 
     Handles pagination to get all ~153 payment market reports.
-    Falls back to __NEXT_DATA__ extraction if Playwright not available.
+    Returns as soon as Playwright succeeds; otherwise falls back to
+    __NEXT_DATA__ (first 40 reports) plus the listing API for later pages.
+
+    Args:
+        client: Shared httpx AsyncClient to reuse; a temporary one is opened if omitted
 
     Returns:
         List of unique report URLs
@@ -38,25 +84,44 @@ async def discover_all_report_urls() -> List[str]:
             urls.update(playwright_urls)
             if len(urls) > 40:
                 print(f"✓ Playwright: Found {len(urls)} reports with pagination")
-                return list(urls)
+                return sorted(urls)
         except Exception as e:
             print(f"⚠ Playwright failed ({e}), falling back to __NEXT_DATA__...")
 
-    # Fallback: Extract from __NEXT_DATA__ (only gets first 40)
+    # Fallback: __NEXT_DATA__ (first 40) plus API pages 2-6 for the rest
+    if client is None:
+        async with httpx.AsyncClient(timeout=30.0) as own_client:
+            await _discover_without_browser(own_client, urls)
+    else:
+        await _discover_without_browser(client, urls)
+
+    # Producers only add valid report URLs, so the set is already clean
+    return sorted(urls)
+
+
+async def _discover_without_browser(
+    client: httpx.AsyncClient,
+    urls: Set[str]
+):
+    """
+    Add report URLs from __NEXT_DATA__ and the listing API to urls.
+
+    Args:
+        client: httpx AsyncClient
+        urls: Set of report URLs to update in place
+    """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            index_urls = await _extract_next_data_urls(client)
-            urls.update(index_urls)
-            print(f"✓ __NEXT_DATA__: Found {len(index_urls)} reports")
+        index_urls = await _extract_next_data_urls(client)
+        urls.update(index_urls)
+        print(f"✓ __NEXT_DATA__: Found {len(index_urls)} reports")
     except Exception as e:
         raise RuntimeError(f"Failed to discover URLs: {e}")
 
-    # Validate and deduplicate
-    unique_urls = list(urls)
-    unique_urls = [u for u in unique_urls if _is_valid_report_url(u)]
-    unique_urls.sort()
-
-    return unique_urls
+    # Remaining reports are only reachable through the paginated API
+    api_urls = await _fetch_api_pages(client, 2, 6)
+    if api_urls:
+        urls.update(api_urls)
+        print(f"✓ API: Found {len(api_urls)} reports on later pages")
 
 
 async def _discover_with_playwright() -> Set[str]:
@@ -75,51 +140,47 @@ async def _discover_with_playwright() -> Set[str]:
         try:
             # Navigate to payments index
             print(f"🌐 Opening {PAYMENTS_INDEX}...")
-            await page.goto(PAYMENTS_INDEX, wait_until='networkidle', timeout=60000)
+            await page.goto(PAYMENTS_INDEX, wait_until='domcontentloaded', timeout=60000)
+
+            # Wait for the first report card instead of network idle
+            await page.wait_for_selector(REPORT_LINK_SELECTOR, timeout=15000)
 
             # Get initial report count from page
-            report_elements = await page.locator('a[href*="/industry-reports/"]').all()
-            print(f"   Found {len(report_elements)} report links initially")
+            report_count = await page.locator(REPORT_LINK_SELECTOR).count()
+            print(f"   Found {report_count} report links initially")
 
             # Scroll through all pages to load all reports
             # The site uses pagination, so we need to click "Load More" or similar
             max_scrolls = 20
             scroll_count = 0
 
-            while scroll_count < max_scrolls:
-                # Get current report count
-                current_reports = await page.locator('a[href*="/industry-reports/"]').all()
-
-                # Scroll to bottom to trigger pagination
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(1000)  # Wait for content to load
+            # Stop as soon as the listing is fully loaded, even before scrolling
+            while scroll_count < max_scrolls and report_count < PLAYWRIGHT_LINK_TARGET:
+                # Scroll to bottom and wait in-page until the new batch has landed
+                new_count = await page.evaluate(
+                    SCROLL_AND_WAIT_JS,
+                    [REPORT_LINK_SELECTOR, 300, 5000]
+                )
 
-                # Check if new reports loaded
-                new_reports = await page.locator('a[href*="/industry-reports/"]').all()
-
-                if len(new_reports) == len(current_reports):
+                if new_count <= report_count:
                     # No new reports loaded, we're done
                     break
 
+                report_count = new_count
                 scroll_count += 1
-                print(f"   Scroll {scroll_count}: {len(new_reports)} reports found")
-
-                # Don't scroll too many times
-                if scroll_count > 1 and len(new_reports) > 150:
-                    break
+                print(f"   Scroll {scroll_count}: {report_count} reports found")
 
-            # Extract all report URLs
-            final_reports = await page.locator('a[href*="/industry-reports/"]').all()
-            print(f"✓ Total reports found: {len(final_reports)}")
+            # Extract and validate all report URLs in one call; .href is already
+            # absolute, and the filter mirrors _is_valid_report_url
+            hrefs = await page.eval_on_selector_all(
+                REPORT_LINK_SELECTOR,
+                "(els, prefix) => els.map(e => e.href)"
+                ".filter(h => h.startsWith(prefix) && h.length > prefix.length)",
+                REPORT_PREFIX
+            )
+            print(f"✓ Total reports found: {len(hrefs)}")
 
-            for element in final_reports:
-                try:
-                    href = await element.get_attribute('href')
-                    if href:
-                        full_url = urljoin(BASE_URL, href)
-                        urls.add(full_url)
-                except:
-                    pass
+            urls.update(hrefs)
 
         except Exception as e:
             print(f"   Error during pagination: {e}")
@@ -141,32 +202,26 @@ async def _extract_next_data_urls(client: httpx.AsyncClient) -> Set[str]:
     urls = set()
 
     try:
-        response = await client.get(
+        async with client.stream(
+            'GET',
             PAYMENTS_INDEX,
             headers={'User-Agent': USER_AGENT}
-        )
-        response.raise_for_status()
-
-        # Extract __NEXT_DATA__ JSON
-        match = re.search(
-            r'<script id="__NEXT_DATA__"\s+type="application/json"[^>]*>([^<]+)</script>',
-            response.text
-        )
-
-        if not match:
-            raise ValueError("Could not find __NEXT_DATA__ in response")
+        ) as response:
+            response.raise_for_status()
+            payload = await _read_next_data(response)
 
-        next_data = json.loads(match.group(1))
+        next_data = json_loads(payload)
 
         # Navigate to reports list - actual path: props -> pageProps -> response -> content -> reportList
-        props = next_data.get('props', {})
-        page_props = props.get('pageProps', {})
-        response_data = page_props.get('response', {})
-        content = response_data.get('content', {})
+        page_props = next_data.get('props', {}).get('pageProps', {})
+        try:
+            report_list = page_props['response']['content']['reportList']  # Current structure
+        except (KeyError, TypeError):
+            report_list = None
 
         # Try different possible paths
         reports = (
-            content.get('reportList') or  # Current structure
+            report_list or
             page_props.get('reports') or   # Alternative
             page_props.get('listings') or  # Fallback
             page_props.get('data', {}).get('reports')  # Old structure
@@ -178,17 +233,20 @@ async def _extract_next_data_urls(client: httpx.AsyncClient) -> Set[str]:
         # Extract URLs from reports
         for report in reports:
             if isinstance(report, dict):
+                get = report.get
                 # Try to get URL directly, or build from slug
-                url = report.get('url') or report.get('link') or report.get('href')
+                url = get('url') or get('link') or get('href')
 
-                if not url and report.get('slug'):
-                    # Build URL from slug: /industry-reports/{slug}
-                    slug = report.get('slug')
-                    url = f"/industry-reports/{slug}"
+                if not url:
+                    slug = get('slug')
+                    if slug:
+                        # Build URL from slug: /industry-reports/{slug}
+                        url = f"/industry-reports/{slug}"
 
                 if url:
                     full_url = urljoin(BASE_URL, url)
-                    urls.add(full_url)
+                    if _is_valid_report_url(full_url):
+                        urls.add(full_url)
 
     except Exception as e:
         raise RuntimeError(f"Failed to extract __NEXT_DATA__ URLs: {e}")
@@ -196,6 +254,47 @@ async def _extract_next_data_urls(client: httpx.AsyncClient) -> Set[str]:
     return urls
 
 
+async def _read_next_data(response: httpx.Response) -> bytes:
+    """
+    Stream the response body and return the raw __NEXT_DATA__ JSON payload.
+
+    Reading stops as soon as the script's closing tag arrives, and the page
+    is never decoded to str.
+
+    Args:
+        response: Streaming httpx response for the index page
+
+    Returns:
+        Bytes between the __NEXT_DATA__ opening and closing tags
+    """
+    buffer = bytearray()
+    tag = start = -1
+
+    async for chunk in response.aiter_bytes():
+        # Only bytes that could complete a match need rescanning
+        previous_len = len(buffer)
+        buffer += chunk
+
+        if tag == -1:
+            tag = buffer.find(NEXT_DATA_OPEN, max(0, previous_len - len(NEXT_DATA_OPEN) + 1))
+            if tag == -1:
+                continue
+
+        if start == -1:
+            tag_end = buffer.find(b'>', max(tag + len(NEXT_DATA_OPEN), previous_len))
+            if tag_end == -1:
+                continue
+            start = tag_end + 1
+
+        end = buffer.find(NEXT_DATA_END, max(start, previous_len - len(NEXT_DATA_END) + 1))
+        if end != -1:
+            return bytes(buffer[start:end])
+
+    if tag == -1:
+        raise ValueError("Could not find __NEXT_DATA__ in response")
+    raise ValueError("Unterminated __NEXT_DATA__ script in response")
+
+
 async def _fetch_api_pages(
     client: httpx.AsyncClient,
     start_page: int,
@@ -223,56 +322,58 @@ async def _fetch_api_pages(
         'https://api.mordorintelligence.com/api/reports',
     ]
 
-    for endpoint in api_endpoints:
-        try:
-            for page in range(start_page, end_page + 1):
-                try:
-                    params = {
-                        'category': 'payments',
-                        'page': page,
-                        'limit': 30
-                    }
-
-                    response = await client.get(
-                        endpoint,
-                        params=params,
-                        headers={'User-Agent': USER_AGENT},
-                        timeout=30.0
-                    )
-
-                    if response.status_code == 404:
-                        # Try next endpoint
-                        break
-
-                    response.raise_for_status()
-
-                    data = response.json()
-
-                    # Extract URLs from response
-                    reports = data.get('data', data.get('reports', []))
-                    if not reports:
-                        break
-
-                    for report in reports:
-                        if isinstance(report, dict):
-                            url = report.get('url') or report.get('link') or report.get('href')
-                            if url:
-                                full_url = urljoin(BASE_URL, url)
-                                urls.add(full_url)
-
-                    # Rate limiting
-                    await asyncio.sleep(REQUEST_DELAY)
-
-                except httpx.RequestError:
-                    continue
-
-            # If we got some URLs, this endpoint works
-            if urls:
-                break
+    params = {'category': 'payments', 'limit': 30}
+    headers = {'User-Agent': USER_AGENT}
+
+    # Probe all endpoints in parallel with a HEAD for the first page
+    probes = await asyncio.gather(
+        *[
+            client.head(endpoint, params={**params, 'page': start_page}, headers=headers, timeout=30.0)
+            for endpoint in api_endpoints
+        ],
+        return_exceptions=True
+    )
+
+    # First endpoint (in preference order) that answers; 405 means it exists but rejects HEAD
+    endpoint = next(
+        (
+            ep for ep, probe in zip(api_endpoints, probes)
+            if not isinstance(probe, BaseException) and probe.status_code in (200, 405)
+        ),
+        None
+    )
+    if endpoint is None:
+        return urls
+
+    # Pages are independent, so fetch them concurrently
+    responses = await asyncio.gather(
+        *[
+            client.get(endpoint, params={**params, 'page': page}, headers=headers, timeout=30.0)
+            for page in range(start_page, end_page + 1)
+        ],
+        return_exceptions=True
+    )
+
+    for response in responses:
+        if isinstance(response, BaseException) or response.status_code != 200:
+            continue
 
-        except Exception as e:
+        try:
+            data = json_loads(response.content)
+        except ValueError:
             continue
 
+        # Extract URLs from response
+        reports = data.get('data', data.get('reports', [])) if isinstance(data, dict) else []
+
+        for report in reports:
+            if isinstance(report, dict):
+                url = report.get('url') or report.get('link') or report.get('href')
+                if url:
+                    full_url = urljoin(BASE_URL, url)
+                    if _is_valid_report_url(full_url):
+                        urls.add(full_url)
+
     return urls
 
 
@@ -280,33 +381,27 @@ def _is_valid_report_url(url: str) -> bool:
     """
     Validate that URL is a valid Mordor Intelligence report.
 
+    Every discovery path builds URLs against BASE_URL, so a report URL is
+    REPORT_PREFIX followed by a slug.
+
     Args:
         url: URL to validate
 
     Returns:
         True if valid report URL
     """
-    if not url or not isinstance(url, str):
-        return False
-
-    try:
-        parsed = urlparse(url)
-
-        # Check domain
-        if 'mordorintelligence.com' not in parsed.netloc:
-            return False
-
-        # Check path pattern
-        if '/industry-reports/' not in parsed.path:
-            return False
-
-        return True
-
-    except:
-        return False
-
-
-async def validate_urls_batch(urls: List[str], max_workers: int = 5) -> dict:
+    return (
+        isinstance(url, str)
+        and url.startswith(REPORT_PREFIX)
+        and len(url) > len(REPORT_PREFIX)
+    )
+
+
+async def validate_urls_batch(
+    urls: List[str],
+    max_workers: int = 5,
+    client: Optional[httpx.AsyncClient] = None
+) -> dict:
     """
     Validate URLs by checking HTTP HEAD response.
     Returns mapping of valid/invalid URLs.
@@ -314,15 +409,18 @@ async def validate_urls_batch(urls: List[str], max_workers: int = 5) -> dict:
     Args:
         urls: List of URLs to validate
         max_workers: Number of concurrent requests
+        client: Shared httpx AsyncClient to reuse; a temporary one is opened if omitted
 
     Returns:
         Dict with 'valid', 'invalid', 'unreachable' lists
     """
     result = {'valid': [], 'invalid': [], 'unreachable': []}
+    semaphore = asyncio.Semaphore(max_workers)
 
     async def check_url(client: httpx.AsyncClient, url: str):
         try:
-            response = await client.head(url, allow_redirects=True, timeout=10.0)
+            async with semaphore:
+                response = await client.head(url, follow_redirects=True, timeout=10.0)
             if response.status_code == 200:
                 result['valid'].append(url)
             elif 400 <= response.status_code < 500:
@@ -332,11 +430,15 @@ async def validate_urls_batch(urls: List[str], max_workers: int = 5) -> dict:
         except Exception:
             result['unreachable'].append(url)
 
-    async with httpx.AsyncClient() as client:
-        # Process in batches
-        for i in range(0, len(urls), max_workers):
-            batch = urls[i:i + max_workers]
-            tasks = [check_url(client, url) for url in batch]
-            await asyncio.gather(*tasks)
+    async def check_all(client: httpx.AsyncClient):
+        # The semaphore caps in-flight requests without a per-batch barrier
+        await asyncio.gather(*(check_url(client, url) for url in urls))
+
+    if client is None:
+        limits = httpx.Limits(max_keepalive_connections=max_workers)
+        async with httpx.AsyncClient(limits=limits) as own_client:
+            await check_all(own_client)
+    else:
+        await check_all(client)
 
     return result
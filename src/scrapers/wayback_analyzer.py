@@ -3,48 +3,309 @@ Analyze Wayback Machine snapshots to determine report update frequency.
 Helps optimize scraping schedule and predict update timing.
 """
 
-import requests
+import asyncio
+import httpx
+import os
+import re
 import json
-from datetime import datetime
-from typing import List, Dict, Optional
-from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+from collections import Counter, defaultdict
 
+from config.settings import WAYBACK_CACHE_DIR, WAYBACK_CACHE_TTL
 
-def get_wayback_snapshots(url: str) -> List[Dict]:
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    import h2  # noqa: F401 - required for httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from diskcache import Cache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# CDX server API: lists every capture of a URL (or URL prefix) in one call
+WAYBACK_CDX_API = "https://web.archive.org/cdx/search/cdx"
+
+# Retries for transient Wayback API failures, with exponential backoff
+WAYBACK_RETRIES = 3
+WAYBACK_RETRY_DELAY = 0.3  # seconds, doubled on each retry
+WAYBACK_MAX_RETRY_DELAY = 30.0  # cap on backoff and on server Retry-After values
+WAYBACK_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Concurrent Wayback queries in analyze_multiple_reports
+WAYBACK_MAX_CONCURRENT = 20
+
+# Bulk CDX queries: report URLs per query and the row cap for each response
+WAYBACK_BULK_BATCH = 25
+WAYBACK_BULK_LIMIT = 20000
+
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+)
+
+_cache = None
+
+
+def _get_cache():
+    """Open the on-disk snapshot cache on first use (None without diskcache)."""
+    global _cache
+    if _cache is None and DISKCACHE_AVAILABLE:
+        _cache = Cache(str(WAYBACK_CACHE_DIR))
+    return _cache
+
+
+def _cache_get(url: str) -> Optional[List[Dict]]:
+    """Return cached snapshots for url, or None if not cached."""
+    cache = _get_cache()
+    return cache.get(url) if cache is not None else None
+
+
+def _cache_set(url: str, snapshots: List[Dict]):
+    """Cache snapshots for url for WAYBACK_CACHE_TTL seconds."""
+    cache = _get_cache()
+    if cache is not None:
+        cache.set(url, snapshots, expire=WAYBACK_CACHE_TTL)
+
+
+def _cdx_params(url: str) -> Dict:
+    """CDX query parameters for all successful captures of a single URL."""
+    return {
+        'url': url,
+        'output': 'json',
+        'filter': 'statuscode:200',
+        'fl': 'timestamp,statuscode',
+    }
+
+
+def _new_client() -> httpx.AsyncClient:
+    """Pooled Wayback client; HTTP/2 multiplexes queries when h2 is installed."""
+    limits = httpx.Limits(
+        max_connections=WAYBACK_MAX_CONCURRENT,
+        max_keepalive_connections=WAYBACK_MAX_CONCURRENT,
+    )
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=limits)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+async def _get_with_retry(
+    client: httpx.AsyncClient,
+    url: str,
+    params: Dict,
+    timeout: float = 10
+) -> httpx.Response:
+    """
+    GET url, retrying connection errors, timeouts and WAYBACK_RETRY_STATUSES
+    responses up to WAYBACK_RETRIES times with exponential backoff (or the
+    server's Retry-After, if longer).
+
+    Raises:
+        httpx.HTTPStatusError: If the final response is not successful
+    """
+    for attempt in range(WAYBACK_RETRIES + 1):
+        delay = WAYBACK_RETRY_DELAY * (2 ** attempt)
+        try:
+            response = await client.get(url, params=params, timeout=timeout)
+        except httpx.RequestError:
+            if attempt == WAYBACK_RETRIES:
+                raise
+        else:
+            if response.status_code not in WAYBACK_RETRY_STATUSES or attempt == WAYBACK_RETRIES:
+                response.raise_for_status()
+                return response
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+        await asyncio.sleep(min(delay, WAYBACK_MAX_RETRY_DELAY))
+
+
+def _parse_timestamp(ts: str) -> datetime:
+    """Parse a fixed-width YYYYMMDDHHMMSS Wayback timestamp by slicing."""
+    return datetime(
+        int(ts[0:4]), int(ts[4:6]), int(ts[6:8]),
+        int(ts[8:10]), int(ts[10:12]), int(ts[12:14])
+    )
+
+
+def _snapshot(timestamp: str, status: str) -> Dict:
+    """Build a snapshot dict from a CDX timestamp and status code."""
+    return {
+        'timestamp': timestamp,
+        'date': _parse_timestamp(timestamp),
+        'status': status
+    }
+
+
+def _parse_snapshots(content: bytes) -> List[Dict]:
+    """
+    Parse a CDX response (fl=timestamp,statuscode) into successful snapshot dicts.
+    The first row of a CDX JSON response is the field header.
+    """
+    rows = json_loads(content)
+
+    return [
+        _snapshot(timestamp, status)
+        for timestamp, status in rows[1:]
+        if status == '200'  # Only successful captures
+    ]
+
+
+def _capture_key(url: str) -> str:
+    """Normalize a URL to host/path so CDX 'original' URLs match report URLs."""
+    rest = url.partition('//')[2] or url
+    rest = rest.split('#', 1)[0].split('?', 1)[0].rstrip('/')
+    host, slash, path = rest.partition('/')
+    host = host.split(':', 1)[0]
+    if host.startswith('www.'):
+        host = host[4:]
+    return host + slash + path
+
+
+async def get_wayback_snapshots(
+    url: str,
+    client: Optional[httpx.AsyncClient] = None
+) -> List[Dict]:
     """
     Query Internet Archive Wayback Machine for all snapshots of a URL.
+    Results are cached on disk for WAYBACK_CACHE_TTL seconds when diskcache is installed.
 
     Args:
         url: Full URL to analyze (e.g., https://www.mordorintelligence.com/industry-reports/...)
+        client: Shared httpx AsyncClient to reuse; a temporary one is opened if omitted
 
     Returns:
         List of snapshots with dates and status codes
     """
-    base_url = "https://archive.org/wayback/available"
-    params = {
-        'url': url,
-        'output': 'json'
+    cached = _cache_get(url)
+    if cached is not None:
+        return cached
+
+    try:
+        if client is None:
+            async with _new_client() as own_client:
+                response = await _get_with_retry(own_client, WAYBACK_CDX_API, _cdx_params(url), timeout=10)
+        else:
+            response = await _get_with_retry(client, WAYBACK_CDX_API, _cdx_params(url), timeout=10)
+        results = _parse_snapshots(response.content)
+        _cache_set(url, results)
+        return results
+
+    except Exception as e:
+        print(f"Error fetching Wayback data for {url}: {e}")
+        return []
+
+
+def _bulk_params(prefix: str, urls: List[str]) -> Dict:
+    """CDX prefix query parameters restricted to the given report URLs' paths."""
+    names = sorted({re.escape(_capture_key(url).rpartition('/')[2]) for url in urls})
+    return {
+        'url': prefix,
+        'matchType': 'prefix',
+        'output': 'json',
+        'filter': ['statuscode:200', f"original:.*/(?:{'|'.join(names)})(?:[/?#].*)?"],
+        'fl': 'original,timestamp,statuscode',
+        'limit': WAYBACK_BULK_LIMIT,
     }
 
+
+async def _fetch_bulk_batch(
+    client: httpx.AsyncClient,
+    prefix: str,
+    urls: List[str]
+) -> Dict[str, List[Dict]]:
+    """One bounded CDX prefix query; returns only URLs with complete results."""
+    wanted = {_capture_key(url): url for url in urls}
+    results: Dict[str, List[Dict]] = {}
+
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        data = response.json()
+        response = await _get_with_retry(
+            client, WAYBACK_CDX_API, _bulk_params(prefix, urls), timeout=60
+        )
+        rows = json_loads(response.content)[1:]
 
-        snapshots = data.get('archived_snapshots', {}).get('snapshots', [])
+        for original, timestamp, status in rows:
+            url = wanted.get(_capture_key(original))
+            if url is not None and status == '200':
+                results.setdefault(url, []).append(_snapshot(timestamp, status))
 
-        return [
-            {
-                'timestamp': snap['timestamp'],
-                'date': datetime.strptime(snap['timestamp'], '%Y%m%d%H%M%S'),
-                'status': snap['status']
-            }
-            for snap in snapshots
-            if snap['status'] == '200'  # Only successful captures
-        ]
+        if len(rows) >= WAYBACK_BULK_LIMIT:
+            # Truncated: rows are sorted by URL, so only the last one may be partial
+            results.pop(wanted.get(_capture_key(rows[-1][0])), None)
 
     except Exception as e:
-        print(f"Error fetching Wayback data for {url}: {e}")
-        return []
+        print(f"Error fetching Wayback data for {prefix}: {e}")
+
+    return results
+
+
+async def get_wayback_snapshots_bulk(
+    client: httpx.AsyncClient,
+    urls: List[str]
+) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Fetch snapshots for many URLs with CDX prefix queries, WAYBACK_BULK_BATCH
+    URLs per query, each filtered to those URLs and capped at WAYBACK_BULK_LIMIT rows.
+
+    Args:
+        client: httpx AsyncClient
+        urls: Report URLs sharing a common directory (e.g. /industry-reports/)
+
+    Returns:
+        Dict mapping URLs to their snapshots, or None if the URLs share no
+        directory prefix. URLs without captures in the responses (never
+        archived, truncated or failed queries) are left out so callers can
+        query them individually.
+    """
+    prefix = os.path.commonprefix(urls)
+    prefix = prefix[:prefix.rfind('/') + 1]
+    if prefix.count('/') < 3:
+        # No common path under a single host
+        return None
+
+    batches = [urls[i:i + WAYBACK_BULK_BATCH] for i in range(0, len(urls), WAYBACK_BULK_BATCH)]
+    results: Dict[str, List[Dict]] = {}
+    for batch_results in await asyncio.gather(
+        *(_fetch_bulk_batch(client, prefix, batch) for batch in batches)
+    ):
+        results.update(batch_results)
+
+    return results
+
+
+def _snapshot_gaps(dates: List[datetime]) -> List[int]:
+    """Positive day gaps between consecutive sorted dates."""
+    # Plain zip rather than a NumPy diff: snapshot lists hold tens of entries,
+    # where building the arrays would cost more than the loop itself
+    return [
+        gap for gap in ((later - earlier).days for earlier, later in zip(dates, dates[1:]))
+        if gap > 0
+    ]
 
 
 def analyze_update_frequency(snapshots: List[Dict]) -> Dict:
@@ -66,14 +327,10 @@ def analyze_update_frequency(snapshots: List[Dict]) -> Dict:
         }
 
     # Sort by date
-    dates = sorted([s['date'] for s in snapshots])
+    dates = sorted(s['date'] for s in snapshots)
 
     # Calculate gaps between consecutive snapshots
-    gaps = []
-    for i in range(1, len(dates)):
-        gap_days = (dates[i] - dates[i-1]).days
-        if gap_days > 0:
-            gaps.append(gap_days)
+    gaps = _snapshot_gaps(dates)
 
     if not gaps:
         return {
@@ -84,10 +341,18 @@ def analyze_update_frequency(snapshots: List[Dict]) -> Dict:
         }
 
     # Calculate statistics
+    # One sort yields min, max and median together
+    sorted_gaps = sorted(gaps)
     avg_gap = sum(gaps) / len(gaps)
-    min_gap = min(gaps)
-    max_gap = max(gaps)
-    median_gap = sorted(gaps)[len(gaps) // 2]
+    min_gap = sorted_gaps[0]
+    max_gap = sorted_gaps[-1]
+
+    # Even-length lists average the two central gaps
+    mid = len(sorted_gaps) // 2
+    if len(sorted_gaps) % 2:
+        median_gap = sorted_gaps[mid]
+    else:
+        median_gap = (sorted_gaps[mid - 1] + sorted_gaps[mid]) / 2
 
     # Determine frequency category
     if avg_gap < 7:
@@ -125,16 +390,17 @@ def analyze_update_frequency(snapshots: List[Dict]) -> Dict:
             'span_days': (dates[-1] - dates[0]).days
         },
         'confidence': confidence,
-        'prediction': predict_next_update(dates)
+        'prediction': predict_next_update(dates, gaps)
     }
 
 
-def predict_next_update(dates: List[datetime]) -> Dict:
+def predict_next_update(dates: List[datetime], gaps: Optional[List[int]] = None) -> Dict:
     """
     Predict when next update might occur based on historical pattern.
 
     Args:
         dates: Sorted list of snapshot dates
+        gaps: Day gaps between dates if already computed
 
     Returns:
         Next expected update date and confidence
@@ -143,11 +409,8 @@ def predict_next_update(dates: List[datetime]) -> Dict:
         return {'prediction': 'unknown', 'confidence': 'low'}
 
     # Calculate average gap
-    gaps = []
-    for i in range(1, len(dates)):
-        gap_days = (dates[i] - dates[i-1]).days
-        if gap_days > 0:
-            gaps.append(gap_days)
+    if gaps is None:
+        gaps = _snapshot_gaps(dates)
 
     if not gaps:
         return {'prediction': 'unknown', 'confidence': 'low'}
@@ -177,19 +440,14 @@ def detect_monthly_pattern(snapshots: List[Dict]) -> Dict:
     Returns:
         Monthly update pattern
     """
-    months = defaultdict(int)
-    quarters = defaultdict(int)
-
-    for snap in snapshots:
-        month_name = snap['date'].strftime('%B')
-        quarter = (snap['date'].month - 1) // 3 + 1
-        months[month_name] += 1
-        quarters[f'Q{quarter}'] += 1
+    snapshot_months = [snap['date'].month for snap in snapshots]
+    months = Counter(MONTH_NAMES[month - 1] for month in snapshot_months)
+    quarters = Counter(f'Q{(month - 1) // 3 + 1}' for month in snapshot_months)
 
     # Find most common
     if months:
-        most_common_month = max(months, key=months.get)
-        most_common_quarter = max(quarters, key=quarters.get)
+        most_common_month = months.most_common(1)[0][0]
+        most_common_quarter = quarters.most_common(1)[0][0]
     else:
         most_common_month = None
         most_common_quarter = None
@@ -218,15 +476,39 @@ async def analyze_multiple_reports(base_urls: List[str]) -> Dict:
     print(f"\n📊 Analyzing {len(base_urls)} reports from Wayback Machine...")
     print("(This may take a minute or two)\n")
 
+    # Serve what we can from the cache, then fetch the rest with bulk CDX
+    # prefix queries, falling back to concurrent per-URL queries for any
+    # URL the bulk responses did not cover
+    snapshots_by_url = {url: _cache_get(url) for url in base_urls}
+    missing = [url for url, snapshots in snapshots_by_url.items() if snapshots is None]
+
+    semaphore = asyncio.Semaphore(WAYBACK_MAX_CONCURRENT)
+
+    async def fetch(client: httpx.AsyncClient, url: str) -> List[Dict]:
+        async with semaphore:
+            return await get_wayback_snapshots(url, client)
+
+    async with _new_client() as client:
+        bulk = await get_wayback_snapshots_bulk(client, missing) if len(missing) > 1 else None
+
+        if bulk:
+            for url, snapshots in bulk.items():
+                _cache_set(url, snapshots)
+            snapshots_by_url.update(bulk)
+
+        remaining = [url for url in missing if snapshots_by_url[url] is None]
+        if remaining:
+            fetched = await asyncio.gather(*(fetch(client, url) for url in remaining))
+            snapshots_by_url.update(zip(remaining, fetched))
+
     for i, url in enumerate(base_urls, 1):
+        snapshots = snapshots_by_url[url]
+
         # Extract slug from URL
         slug = url.split('/')[-1]
 
         print(f"[{i}/{len(base_urls)}] {slug}...", end=' ', flush=True)
 
-        # Get snapshots
-        snapshots = get_wayback_snapshots(url)
-
         if snapshots:
             analysis = analyze_update_frequency(snapshots)
             monthly = detect_monthly_pattern(snapshots)
@@ -250,21 +532,22 @@ async def analyze_multiple_reports(base_urls: List[str]) -> Dict:
     return results
 
 
-def generate_report(analysis_results: Dict) -> str:
+def iter_report_lines(analysis_results: Dict) -> Iterator[str]:
     """
-    Generate human-readable report of update frequency analysis.
+    Yield the lines of the update frequency report one at a time.
+
+    Lets callers stream the report to a file instead of building one string.
 
     Args:
         analysis_results: Results from analyze_multiple_reports()
 
-    Returns:
-        Formatted report string
+    Yields:
+        Report lines without trailing newlines
     """
-    report = []
-    report.append("=" * 100)
-    report.append("MARKET REPORT UPDATE FREQUENCY ANALYSIS")
-    report.append("=" * 100)
-    report.append("")
+    yield "=" * 100
+    yield "MARKET REPORT UPDATE FREQUENCY ANALYSIS"
+    yield "=" * 100
+    yield ""
 
     # Group by frequency
     by_frequency = defaultdict(list)
@@ -274,45 +557,57 @@ def generate_report(analysis_results: Dict) -> str:
         by_frequency[freq].append(slug)
 
     # Show summary
-    report.append("📊 SUMMARY BY FREQUENCY")
-    report.append("-" * 100)
+    yield "📊 SUMMARY BY FREQUENCY"
+    yield "-" * 100
     for freq in ['daily', 'weekly', 'monthly', 'quarterly', 'semi-annual', 'yearly', 'unknown']:
         markets = by_frequency.get(freq, [])
         if markets:
-            report.append(f"\n{freq.upper()}: {len(markets)} markets")
+            yield f"\n{freq.upper()}: {len(markets)} markets"
             for slug in markets[:3]:
-                report.append(f"  • {slug}")
+                yield f"  • {slug}"
             if len(markets) > 3:
-                report.append(f"  ... and {len(markets) - 3} more")
+                yield f"  ... and {len(markets) - 3} more"
 
     # Detailed analysis
-    report.append("\n" + "=" * 100)
-    report.append("DETAILED ANALYSIS")
-    report.append("=" * 100)
+    yield "\n" + "=" * 100
+    yield "DETAILED ANALYSIS"
+    yield "=" * 100
 
     for slug, data in sorted(analysis_results.items())[:10]:  # Top 10
         analysis = data['analysis']
 
         if analysis['status'] == 'success':
-            report.append(f"\n📍 {slug}")
-            report.append(f"  Frequency: {analysis['frequency']}")
-            report.append(f"  Confidence: {analysis['confidence']}")
-            report.append(f"  Snapshots: {analysis['total_snapshots']}")
-            report.append(f"  Avg Gap: {analysis['avg_gap_days']} days")
-            report.append(f"  Range: {analysis['min_gap_days']}-{analysis['max_gap_days']} days")
-            report.append(f"  Data Span: {analysis['date_range']['span_days']} days")
-            report.append(f"  Latest: {analysis['date_range']['last']}")
+            yield f"\n📍 {slug}"
+            yield f"  Frequency: {analysis['frequency']}"
+            yield f"  Confidence: {analysis['confidence']}"
+            yield f"  Snapshots: {analysis['total_snapshots']}"
+            yield f"  Avg Gap: {analysis['avg_gap_days']} days"
+            yield f"  Range: {analysis['min_gap_days']}-{analysis['max_gap_days']} days"
+            yield f"  Data Span: {analysis['date_range']['span_days']} days"
+            yield f"  Latest: {analysis['date_range']['last']}"
 
             if analysis.get('prediction'):
                 pred = analysis['prediction']
-                report.append(f"  Next Expected: {pred['prediction']} (±{pred['margin_days']} days)")
+                yield f"  Next Expected: {pred['prediction']} (±{pred['margin_days']} days)"
 
             # Seasonal info
             seasonal = data['seasonal']
             if seasonal.get('is_seasonal'):
-                report.append(f"  Pattern: Seasonal updates in {seasonal['most_common_month']}")
+                yield f"  Pattern: Seasonal updates in {seasonal['most_common_month']}"
 
-    return "\n".join(report)
+
+
+def generate_report(analysis_results: Dict) -> str:
+    """
+    Generate human-readable report of update frequency analysis.
+
+    Args:
+        analysis_results: Results from analyze_multiple_reports()
+
+    Returns:
+        Formatted report string
+    """
+    return "\n".join(iter_report_lines(analysis_results))
 
 
 # Example usage
@@ -322,7 +617,7 @@ if __name__ == "__main__":
 
     print(f"Analyzing: {sample_url}\n")
 
-    snapshots = get_wayback_snapshots(sample_url)
+    snapshots = asyncio.run(get_wayback_snapshots(sample_url))
     print(f"Found {len(snapshots)} snapshots\n")
 
     if snapshots:
@@ -4,11 +4,18 @@ Follows financial reporting best practices.
 """
 
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
 from typing import Optional, Tuple, List
 from datetime import datetime
 from src.models.temporal import YearlyValue, CAGRCalculation, TemporalAssumptions
 
 
+@lru_cache(maxsize=4096)
+def _cagr_float(start: float, end: float, years: int) -> float:
+    """CAGR percentage in float; memoized since reports share values and horizons."""
+    return ((end / start) ** (1.0 / years) - 1.0) * 100.0
+
+
 def calculate_cagr(
     start_value: Decimal,
     end_value: Decimal,
@@ -35,20 +42,12 @@ def calculate_cagr(
     if years <= 0:
         return Decimal(0)
 
-    # Use Decimal for precision
-    start = Decimal(str(start_value))
-    end = Decimal(str(end_value))
-    n = Decimal(str(years))
-
-    # CAGR = (End/Start)^(1/n) - 1
-    ratio = end / start
-    # Calculate nth root: ratio^(1/n)
-    exponent = 1 / float(n)
-    nth_root = float(ratio) ** exponent
-    cagr = (Decimal(str(nth_root)) - 1) * 100
+    # CAGR = (End/Start)^(1/n) - 1; the nth root is a float operation anyway,
+    # so stay in float and convert to Decimal once for rounding
+    cagr_pct = _cagr_float(float(start_value), float(end_value), years)
 
     # Round to 2 decimal places
-    return cagr.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return Decimal(str(cagr_pct)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
 
 def create_cagr_calculation(
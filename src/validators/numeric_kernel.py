@@ -0,0 +1,111 @@
+"""
+Numeric range checks for batch report validation.
+Compiled with Numba when installed, with a NumPy fallback.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Error bits
+ERR_CURRENT_SIZE = 1
+ERR_FORECAST_SIZE = 2
+ERR_SEGMENT_SHARE = 4
+ERR_CLOUD_SHARE = 8
+
+# Warning bits
+WARN_CAGR = 1
+WARN_FASTEST_CAGR = 2
+
+
+def _mask_numeric_numpy(
+    ms_cur: np.ndarray,
+    ms_fc: np.ndarray,
+    cagr: np.ndarray,
+    fg_cagr: np.ndarray,
+    seg_share: np.ndarray,
+    cloud_share: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """NumPy version of mask_numeric; NaN (missing) values never match."""
+    errs = (
+        (ms_cur <= 0) * ERR_CURRENT_SIZE
+        | (ms_fc <= 0) * ERR_FORECAST_SIZE
+        | ((seg_share < 0) | (seg_share > 100)) * ERR_SEGMENT_SHARE
+        | ((cloud_share < 0) | (cloud_share > 100)) * ERR_CLOUD_SHARE
+    ).astype(np.uint8)
+    warns = (
+        (np.abs(cagr) > 100) * WARN_CAGR
+        | (np.abs(fg_cagr) > 100) * WARN_FASTEST_CAGR
+    ).astype(np.uint8)
+    return errs, warns
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, boundscheck=False, error_model='numpy')
+    def _mask_numeric_jit(
+        ms_cur: np.ndarray,
+        ms_fc: np.ndarray,
+        cagr: np.ndarray,
+        fg_cagr: np.ndarray,
+        seg_share: np.ndarray,
+        cloud_share: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n = ms_cur.shape[0]
+        errs = np.zeros(n, dtype=np.uint8)
+        warns = np.zeros(n, dtype=np.uint8)
+
+        # Comparisons with NaN are False, so missing values never match
+        for i in prange(n):
+            e = 0
+            if ms_cur[i] <= 0:
+                e |= ERR_CURRENT_SIZE
+            if ms_fc[i] <= 0:
+                e |= ERR_FORECAST_SIZE
+            if seg_share[i] < 0 or seg_share[i] > 100:
+                e |= ERR_SEGMENT_SHARE
+            if cloud_share[i] < 0 or cloud_share[i] > 100:
+                e |= ERR_CLOUD_SHARE
+            errs[i] = e
+
+            w = 0
+            if abs(cagr[i]) > 100:
+                w |= WARN_CAGR
+            if abs(fg_cagr[i]) > 100:
+                w |= WARN_FASTEST_CAGR
+            warns[i] = w
+
+        return errs, warns
+
+
+def mask_numeric(
+    ms_cur: np.ndarray,
+    ms_fc: np.ndarray,
+    cagr: np.ndarray,
+    fg_cagr: np.ndarray,
+    seg_share: np.ndarray,
+    cloud_share: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate the numeric validation rules over float64 arrays (NaN = missing).
+
+    Args:
+        ms_cur: Current market size values
+        ms_fc: Forecast market size values
+        cagr: CAGR percentages
+        fg_cagr: Fastest growing country CAGR percentages
+        seg_share: Leading segment share percentages
+        cloud_share: Cloud share percentages
+
+    Returns:
+        Tuple of (error bitmask, warning bitmask) uint8 arrays, using the
+        ERR_* and WARN_* bits
+    """
+    if NUMBA_AVAILABLE:
+        return _mask_numeric_jit(ms_cur, ms_fc, cagr, fg_cagr, seg_share, cloud_share)
+    return _mask_numeric_numpy(ms_cur, ms_fc, cagr, fg_cagr, seg_share, cloud_share)
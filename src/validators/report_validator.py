@@ -3,11 +3,45 @@ Data quality validators for parsed reports.
 Validates extracted fields meet expected constraints.
 """
 
-from typing import List, Dict, Any
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping
 from datetime import datetime
 from decimal import Decimal
 
-from src.models.schema import Report
+import numpy as np
+import pandas as pd
+
+from src.models.schema import Report, MSGSPEC_AVAILABLE
+
+if MSGSPEC_AVAILABLE:
+    import msgspec
+    from src.models.schema import ReportStruct
+from src.validators import numeric_kernel as nk
+
+
+# Key fields counted in the "few key fields populated" warning
+_KEY_FIELDS = (
+    'market_size_current_value', 'cagr_percent', 'major_players',
+    'leading_segment_name', 'region',
+)
+KEY_FIELD_COUNT = len(_KEY_FIELDS)
+
+# Report fields read by validate_batch
+_BATCH_COLUMNS = (
+    'slug', 'title', 'url',
+    'market_size_current_value', 'market_size_forecast_value',
+    'cagr_percent', 'fastest_growing_country_cagr',
+    'study_period_start', 'study_period_end', 'major_players',
+    'leading_segment_share_percent', 'cloud_share_percent',
+    'leading_segment_name', 'region',
+)
+
+
+@lru_cache(maxsize=1)
+def _current_year(hour_bucket: int) -> int:
+    """Current year, read from the clock at most once per hour bucket."""
+    return datetime.now().year
 
 
 class ReportValidator:
@@ -21,115 +55,292 @@ class ReportValidator:
         Returns:
             Dict with 'errors' and 'warnings' lists
         """
-        result = {'errors': [], 'warnings': []}
+        return ReportValidator._validate_fields(report.__dict__)
+
+    @staticmethod
+    def validate_struct(report: 'ReportStruct') -> Dict[str, List[str]]:
+        """
+        Validate a ReportStruct (requires msgspec).
+
+        Runs the same checks as validate(); numeric values in messages are
+        formatted as floats.
+
+        Returns:
+            Dict with 'errors' and 'warnings' lists
+        """
+        return ReportValidator._validate_fields(msgspec.structs.asdict(report))
+
+    @staticmethod
+    def _validate_fields(fields: Mapping[str, Any]) -> Dict[str, List[str]]:
+        """Run every check from validate() against a mapping of report fields."""
+        # Read fields once into locals (plain dict lookups, no attribute dispatch)
+        slug = fields['slug']
+        title = fields['title']
+        url = fields['url']
+        market_size_current_value = fields['market_size_current_value']
+        market_size_forecast_value = fields['market_size_forecast_value']
+        cagr_percent = fields['cagr_percent']
+        fastest_growing_country_cagr = fields['fastest_growing_country_cagr']
+        study_period_start = fields['study_period_start']
+        study_period_end = fields['study_period_end']
+        major_players = fields['major_players']
+        leading_segment_share_percent = fields['leading_segment_share_percent']
+        cloud_share_percent = fields['cloud_share_percent']
+        leading_segment_name = fields['leading_segment_name']
+        region = fields['region']
+
+        # Range checks only need float precision; messages keep the Decimal values
+        current_f = None if market_size_current_value is None else float(market_size_current_value)
+        forecast_f = None if market_size_forecast_value is None else float(market_size_forecast_value)
+        cagr_f = None if cagr_percent is None else float(cagr_percent)
+        fastest_cagr_f = (
+            None if fastest_growing_country_cagr is None else float(fastest_growing_country_cagr)
+        )
+        segment_share_f = (
+            None if leading_segment_share_percent is None else float(leading_segment_share_percent)
+        )
+        cloud_share_f = None if cloud_share_percent is None else float(cloud_share_percent)
+
+        errors: List[str] = []
+        warnings: List[str] = []
+        e_append = errors.append
+        w_append = warnings.append
 
         # Required fields
-        if not report.slug:
-            result['errors'].append('Missing slug')
-        if not report.title:
-            result['errors'].append('Missing title')
-        if not report.url:
-            result['errors'].append('Missing url')
+        if not slug:
+            e_append('Missing slug')
+        if not title:
+            e_append('Missing title')
+        if not url:
+            e_append('Missing url')
 
         # Market size validation
-        if report.market_size_current_value is not None:
-            if report.market_size_current_value <= 0:
-                result['errors'].append(
-                    f'Invalid current market size: {report.market_size_current_value}'
+        if current_f is not None:
+            if current_f <= 0:
+                e_append(
+                    f'Invalid current market size: {market_size_current_value}'
                 )
 
-        if report.market_size_forecast_value is not None:
-            if report.market_size_forecast_value <= 0:
-                result['errors'].append(
-                    f'Invalid forecast market size: {report.market_size_forecast_value}'
+        if forecast_f is not None:
+            if forecast_f <= 0:
+                e_append(
+                    f'Invalid forecast market size: {market_size_forecast_value}'
                 )
 
         # CAGR validation
-        if report.cagr_percent is not None:
-            if report.cagr_percent < -100 or report.cagr_percent > 100:
-                result['warnings'].append(
-                    f'Unusual CAGR: {report.cagr_percent}%'
+        if cagr_f is not None:
+            if abs(cagr_f) > 100:
+                w_append(
+                    f'Unusual CAGR: {cagr_percent}%'
                 )
 
         # Fastest growing CAGR
-        if report.fastest_growing_country_cagr is not None:
-            if report.fastest_growing_country_cagr < -100 or report.fastest_growing_country_cagr > 100:
-                result['warnings'].append(
-                    f'Unusual fastest growing CAGR: {report.fastest_growing_country_cagr}%'
+        if fastest_cagr_f is not None:
+            if abs(fastest_cagr_f) > 100:
+                w_append(
+                    f'Unusual fastest growing CAGR: {fastest_growing_country_cagr}%'
                 )
 
         # Study period validation
-        if report.study_period_start and report.study_period_end:
-            if report.study_period_end < report.study_period_start:
-                result['errors'].append(
-                    f'Study period end ({report.study_period_end}) before start ({report.study_period_start})'
+        if study_period_start and study_period_end:
+            if study_period_end < study_period_start:
+                e_append(
+                    f'Study period end ({study_period_end}) before start ({study_period_start})'
                 )
 
             # Check for reasonable date range
-            current_year = datetime.now().year
-            if report.study_period_end > current_year + 50:
-                result['warnings'].append(
-                    f'Study period end year seems too far in future: {report.study_period_end}'
+            current_year = _current_year(int(time.time()) // 3600)
+            if study_period_end > current_year + 50:
+                w_append(
+                    f'Study period end year seems too far in future: {study_period_end}'
                 )
 
         # Players count
-        if report.major_players:
-            if len(report.major_players) > 20:
-                result['warnings'].append(
-                    f'Many major players listed: {len(report.major_players)}'
-                )
-            elif len(report.major_players) == 0:
-                result['warnings'].append('No major players extracted')
+        if major_players:
+            player_count = len(major_players)
+            if player_count > 20:
+                w_append(f'Many major players listed: {player_count}')
+        elif major_players is not None:
+            # Empty list (extraction ran, found nothing) vs None (not extracted)
+            w_append('No major players extracted')
 
         # Segment share validation
-        if report.leading_segment_share_percent is not None:
-            if report.leading_segment_share_percent < 0 or report.leading_segment_share_percent > 100:
-                result['errors'].append(
-                    f'Invalid leading segment share: {report.leading_segment_share_percent}%'
+        if segment_share_f is not None:
+            if segment_share_f < 0 or segment_share_f > 100:
+                e_append(
+                    f'Invalid leading segment share: {leading_segment_share_percent}%'
                 )
 
         # Cloud share validation
-        if report.cloud_share_percent is not None:
-            if report.cloud_share_percent < 0 or report.cloud_share_percent > 100:
-                result['errors'].append(
-                    f'Invalid cloud share: {report.cloud_share_percent}%'
+        if cloud_share_f is not None:
+            if cloud_share_f < 0 or cloud_share_f > 100:
+                e_append(
+                    f'Invalid cloud share: {cloud_share_percent}%'
                 )
 
         # Check that at least some key fields are populated
-        key_fields = [
-            'market_size_current_value', 'cagr_percent', 'major_players',
-            'leading_segment_name', 'region'
-        ]
-        populated = sum(1 for field in key_fields if getattr(report, field) is not None)
+        populated = (
+            (market_size_current_value is not None)
+            + (cagr_percent is not None)
+            + (major_players is not None)
+            + (leading_segment_name is not None)
+            + (region is not None)
+        )
         if populated < 2:
-            result['warnings'].append(
-                f'Few key fields populated: {populated}/{len(key_fields)}'
+            w_append(
+                f'Few key fields populated: {populated}/{KEY_FIELD_COUNT}'
             )
 
-        return result
+        return {'errors': errors, 'warnings': warnings}
+
+    @staticmethod
+    def validate_batch(reports: List[Report]) -> pd.DataFrame:
+        """
+        Validate many reports with vectorized column checks.
+
+        Produces the same errors and warnings as validate() for each report;
+        messages are only formatted for rows that fail a check.
+
+        Returns:
+            DataFrame with 'slug', 'errors' and 'warnings' columns, one row per report
+        """
+        # Object dtype keeps Python values (and truthiness) intact
+        df = pd.DataFrame(
+            [report.__dict__ for report in reports],
+            columns=list(_BATCH_COLUMNS),
+            dtype=object
+        )
+        errors: List[List[str]] = [[] for _ in reports]
+        warnings: List[List[str]] = [[] for _ in reports]
+
+        def num(column: str) -> np.ndarray:
+            return df[column].astype('float64').to_numpy()
+
+        def flag(
+            mask: np.ndarray,
+            messages: List[List[str]],
+            message: Callable[[Report], str]
+        ) -> None:
+            for i in np.flatnonzero(np.asarray(mask, dtype=bool)):
+                messages[i].append(message(reports[i]))
+
+        # Required fields
+        flag(~df['slug'].astype(bool).to_numpy(), errors, lambda r: 'Missing slug')
+        flag(~df['title'].astype(bool).to_numpy(), errors, lambda r: 'Missing title')
+        flag(~df['url'].astype(bool).to_numpy(), errors, lambda r: 'Missing url')
+
+        # Numeric range checks in one kernel pass (Numba when installed)
+        errs, warns = nk.mask_numeric(
+            num('market_size_current_value'),
+            num('market_size_forecast_value'),
+            num('cagr_percent'),
+            num('fastest_growing_country_cagr'),
+            num('leading_segment_share_percent'),
+            num('cloud_share_percent'),
+        )
+
+        # Market size validation
+        flag(errs & nk.ERR_CURRENT_SIZE, errors,
+             lambda r: f'Invalid current market size: {r.market_size_current_value}')
+        flag(errs & nk.ERR_FORECAST_SIZE, errors,
+             lambda r: f'Invalid forecast market size: {r.market_size_forecast_value}')
+
+        # CAGR validation
+        flag(warns & nk.WARN_CAGR, warnings,
+             lambda r: f'Unusual CAGR: {r.cagr_percent}%')
+        flag(warns & nk.WARN_FASTEST_CAGR, warnings,
+             lambda r: f'Unusual fastest growing CAGR: {r.fastest_growing_country_cagr}%')
+
+        # Study period validation
+        start = num('study_period_start')
+        end = num('study_period_end')
+        has_period = (
+            df['study_period_start'].astype(bool) & df['study_period_end'].astype(bool)
+        ).to_numpy()
+        flag(has_period & (end < start), errors,
+             lambda r: f'Study period end ({r.study_period_end}) before start ({r.study_period_start})')
+
+        current_year = _current_year(int(time.time()) // 3600)
+        flag(has_period & (end > current_year + 50), warnings,
+             lambda r: f'Study period end year seems too far in future: {r.study_period_end}')
+
+        # Players count
+        player_counts = df['major_players'].map(
+            lambda players: -1 if players is None else len(players)
+        ).to_numpy()
+        flag(player_counts > 20, warnings,
+             lambda r: f'Many major players listed: {len(r.major_players or ())}')
+        flag(player_counts == 0, warnings, lambda r: 'No major players extracted')
+
+        # Segment share validation
+        flag(errs & nk.ERR_SEGMENT_SHARE, errors,
+             lambda r: f'Invalid leading segment share: {r.leading_segment_share_percent}%')
+
+        # Cloud share validation
+        flag(errs & nk.ERR_CLOUD_SHARE, errors,
+             lambda r: f'Invalid cloud share: {r.cloud_share_percent}%')
+
+        # Check that at least some key fields are populated
+        populated = df[list(_KEY_FIELDS)].notna().sum(axis=1).to_numpy()
+        for i in np.flatnonzero(populated < 2):
+            warnings[i].append(f'Few key fields populated: {populated[i]}/{KEY_FIELD_COUNT}')
+
+        return pd.DataFrame({'slug': df['slug'], 'errors': errors, 'warnings': warnings})
 
     @staticmethod
     def is_valid(report: Report) -> bool:
         """Check if report is valid (no critical errors)."""
-        validation = ReportValidator.validate(report)
-        return len(validation['errors']) == 0
+        return ReportValidator._validate_errors_only(report)
+
+    @staticmethod
+    def _validate_errors_only(report: Report) -> bool:
+        """
+        Run only the error checks from validate(), stopping at the first failure.
+        Must stay in sync with the error branches of validate().
+        """
+        if not report.slug or not report.title or not report.url:
+            return False
+
+        current = report.market_size_current_value
+        if current is not None and float(current) <= 0:
+            return False
+
+        forecast = report.market_size_forecast_value
+        if forecast is not None and float(forecast) <= 0:
+            return False
+
+        if report.study_period_start and report.study_period_end:
+            if report.study_period_end < report.study_period_start:
+                return False
+
+        segment_share = report.leading_segment_share_percent
+        if segment_share is not None:
+            segment_share_f = float(segment_share)
+            if segment_share_f < 0 or segment_share_f > 100:
+                return False
+
+        cloud_share = report.cloud_share_percent
+        if cloud_share is not None:
+            cloud_share_f = float(cloud_share)
+            if cloud_share_f < 0 or cloud_share_f > 100:
+                return False
+
+        return True
 
     @staticmethod
     def format_validation_report(validation: Dict[str, List[str]]) -> str:
         """Format validation result as string."""
-        lines = []
+        errors = validation['errors']
+        warnings = validation['warnings']
+        if not errors and not warnings:
+            return '✓ Valid'
 
-        if validation['errors']:
+        lines = []
+        if errors:
             lines.append('ERRORS:')
-            for error in validation['errors']:
-                lines.append(f'  - {error}')
-
-        if validation['warnings']:
+            lines.extend(f'  - {error}' for error in errors)
+        if warnings:
             lines.append('WARNINGS:')
-            for warning in validation['warnings']:
-                lines.append(f'  - {warning}')
-
-        if not validation['errors'] and not validation['warnings']:
-            lines.append('✓ Valid')
+            lines.extend(f'  - {warning}' for warning in warnings)
 
         return '\n'.join(lines)
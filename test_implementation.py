@@ -7,9 +7,19 @@ Tests: models, regex patterns, JSON-LD parser, versioning, database.
 import sys
 from datetime import datetime
 from decimal import Decimal
-import json
 
-from src.models.schema import Report, FAQPair
+import pytest
+
+try:
+    import xdist  # noqa: F401
+    XDIST_AVAILABLE = True
+except ImportError:
+    XDIST_AVAILABLE = False
+
+from src.models.schema import Report, FAQPair, validate_python, MSGSPEC_AVAILABLE
+
+if MSGSPEC_AVAILABLE:
+    from src.models.schema import report_to_struct
 from src.parsers import regex_patterns as rp
 from src.parsers.jsonld_parser import JSONLDParser
 from src.database.versioning import VersionManager
@@ -21,21 +31,22 @@ def test_models():
     print("Testing Models...")
 
     # Create a report
-    report = Report(
-        slug="test-market",
-        title="Test Market Report",
-        url="https://www.mordorintelligence.com/industry-reports/test-market",
-        market_size_current_value=Decimal("123.45"),
-        market_size_current_unit="Billion",
-        market_size_current_year=2026,
-        cagr_percent=Decimal("12.5"),
-        region="Asia-Pacific",
-        major_players=["Company A", "Company B"],
-        leading_segment_name="Cloud",
-        leading_segment_share_percent=Decimal("45.0"),
-        cloud_share_percent=Decimal("68.0"),
-        scraped_at=datetime.utcnow(),
-    )
+    report = validate_python({
+        "slug": "test-market",
+        "title": "Test Market Report",
+        "url": "https://www.mordorintelligence.com/industry-reports/test-market",
+        "market_size_current_value": "123.45",
+        "market_size_current_unit": "Billion",
+        "market_size_current_year": 2026,
+        "cagr_percent": "12.5",
+        "region": "Asia-Pacific",
+        "major_players": ["Company A", "Company B"],
+        "leading_segment_name": "Cloud",
+        "leading_segment_share_percent": "45.0",
+        "cloud_share_percent": "68.0",
+        "scraped_at": datetime.utcnow(),
+    })
+    assert isinstance(report, Report) and report.cagr_percent == Decimal("12.5")
 
     # Test content hash
     hash1 = report.compute_content_hash()
@@ -48,13 +59,11 @@ def test_models():
     print("  ✓ Content hash is deterministic")
 
     # Test changed fields detection
-    report2 = report.model_copy()
-    report2.cagr_percent = Decimal("15.0")
+    report2 = Report.model_construct(**{**report.__dict__, 'cagr_percent': Decimal("15.0")})
     changed = report2.get_changed_fields(report)
     assert 'cagr_percent' in changed, "Changed fields should detect CAGR change"
     print(f"  ✓ Changed fields detection works: {changed}")
 
-    return True
 
 
 def test_regex_patterns():
@@ -80,6 +89,7 @@ def test_regex_patterns():
     companies = rp.extract_companies(text)
     assert any("Mastercard" in c and "Inc" in c for c in companies), f"Should find Mastercard in {companies}"
     assert any("Visa" in c and "Ltd" in c for c in companies), f"Should find Visa in {companies}"
+    assert rp.extract_companies("No listed players in this answer") == ()
     print(f"  ✓ Company extraction works: {companies}")
 
     # Test fastest growing
@@ -96,7 +106,29 @@ def test_regex_patterns():
     assert cloud == Decimal("72.34"), f"Expected 72.34, got {cloud}"
     print("  ✓ Cloud share extraction works")
 
-    return True
+    # Test labeled percentage and year extraction
+    text = "Market share: 45.67% in 2026, up from 2024"
+    assert rp.extract_percentage(text, label="Market share") == Decimal("45.67")
+    assert rp.extract_percentage(text) == Decimal("45.67")
+    assert rp.extract_year(text) == 2026
+    assert rp.extract_all_years(text) == (2026, 2024)
+    print("  ✓ Percentage and year extraction works")
+
+    # Test region extraction
+    assert rp.extract_region("Growth is led by asia-pacific buyers") == "Asia-Pacific"
+    assert rp.extract_region("No geography here") is None
+    assert rp.extract_region("North America leads, followed by Asia-Pacific") == "Asia-Pacific"
+    assert rp.extract_region("Europe and Middle East and Africa") == "Europe"
+    print("  ✓ Region extraction works")
+
+    # Lowercased-text variants agree with the case-insensitive patterns
+    text = "Valued at USD 6.34 Trillion in 2026 with a CAGR of 5.51%. Cloud deployments accounted for 68.34%"
+    lower = text.lower()
+    assert rp.extract_all_market_sizes(lower, lowered=True) == rp.extract_all_market_sizes(text)
+    assert rp.extract_all_cagrs(lower, lowered=True) == rp.extract_all_cagrs(text)
+    assert rp.extract_cloud_share(lower, lowered=True) == rp.extract_cloud_share(text)
+    print("  ✓ Lowercased pattern variants match")
+
 
 
 def test_jsonld_parser():
@@ -146,72 +178,84 @@ def test_jsonld_parser():
     assert report.content_hash is not None and len(report.content_hash) == 64
     print("  ✓ Parser computes content hash")
 
-    return True
+    # Integer and trailing-zero values keep their text form, so content hashes
+    # of already-stored reports do not change (pinned to the original parser)
+    html = """
+    <html><head><title>Brazil Instant Payments Market</title>
+    <script type="application/ld+json">
+    {"@context": "https://schema.org", "@type": "FAQPage", "mainEntity": [
+     {"@type": "Question", "name": "How big is the market?",
+      "acceptedAnswer": {"@type": "Answer", "text": "The market is valued at USD 5 billion in 2025 and is expected to reach USD 12.50 billion by 2030, growing at a CAGR of 12%. North America and Asia-Pacific buyers lead. Cloud deployments accounted for 60.00% of the market. Key players include Visa Inc. and PIX Ltd."}}
+    ]}
+    </script></head></html>
+    """
+    url = "https://www.mordorintelligence.com/industry-reports/brazil-instant-payments-market"
+    report = JSONLDParser(html, url).parse_report()
+    assert str(report.market_size_current_value) == "5"
+    assert str(report.market_size_forecast_value) == "12.50"
+    assert str(report.cagr_percent) == "12"
+    assert report.content_hash == "7a1cb243ecfac7c0cd05cfcea543075c1833e95671078850d23936c395b2b1bc"
+    print("  ✓ Content hash matches baseline")
+
 
 
-def test_validators():
+def test_validators(sample_report):
     """Test data validators."""
     print("\nTesting Validators...")
 
     # Valid report
-    report = Report(
-        slug="test-market",
-        title="Test Report",
-        url="https://www.mordorintelligence.com/industry-reports/test",
-        market_size_current_value=Decimal("100"),
-        cagr_percent=Decimal("10.5"),
-        major_players=["Company A", "Company B"],
-        region="Asia-Pacific",
-        scraped_at=datetime.utcnow(),
-    )
-
+    report = sample_report
     validation = ReportValidator.validate(report)
     assert len(validation['errors']) == 0, "Valid report should have no errors"
     print("  ✓ Valid report passes validation")
 
     # Invalid report (negative market size)
-    report2 = report.model_copy()
-    report2.market_size_current_value = Decimal("-100")
+    report2 = Report.model_construct(
+        **{**report.__dict__, 'market_size_current_value': Decimal("-100")}
+    )
     validation = ReportValidator.validate(report2)
     assert len(validation['errors']) > 0, "Negative market size should error"
     print("  ✓ Invalid market size detected")
 
+    # A stale stored content_hash does not hide the changed field
+    hashed = Report.model_construct(**{**report.__dict__, 'content_hash': report.compute_content_hash()})
+    assert ReportValidator.validate(hashed)['errors'] == []
+    hashed.market_size_current_value = Decimal("-100")
+    assert ReportValidator.validate(hashed)['errors'], "Changed field should be re-validated"
+    print("  ✓ Validation reads current field values")
+
     # Invalid report (bad CAGR)
-    report3 = report.model_copy()
-    report3.cagr_percent = Decimal("150")
+    report3 = Report.model_construct(**{**report.__dict__, 'cagr_percent': Decimal("150")})
     validation = ReportValidator.validate(report3)
     assert len(validation['warnings']) > 0, "Unusual CAGR should warn"
     print("  ✓ Unusual CAGR detected")
 
-    return True
+    # Batch validation matches per-report validation
+    reports = [report, report2, report3]
+    batch = ReportValidator.validate_batch(reports)
+    for i, r in enumerate(reports):
+        expected = ReportValidator.validate(r)
+        assert batch['errors'][i] == expected['errors']
+        assert batch['warnings'][i] == expected['warnings']
+    print("  ✓ Batch validation matches per-report validation")
 
+    # msgspec struct path flags the same problems
+    if MSGSPEC_AVAILABLE:
+        validation = ReportValidator.validate_struct(report_to_struct(report2))
+        assert len(validation['errors']) > 0, "Negative market size should error"
+        print("  ✓ Struct validation works")
 
-def test_versioning():
-    """Test versioning and change detection."""
-    print("\nTesting Versioning...")
-
-    import os
-    import duckdb
 
-    # Create test database with schema
-    test_db = "data/test_version.duckdb"
-    if os.path.exists(test_db):
-        os.remove(test_db)
 
-    # Initialize schema
-    conn = duckdb.connect(test_db)
-    schema_file = "src/database/schema.sql"
-    with open(schema_file, 'r') as f:
-        schema = f.read()
-    conn.execute(schema)
-    conn.commit()
-    conn.close()
+def test_versioning(test_db):
+    """Test versioning and change detection."""
+    print("\nTesting Versioning...")
 
     # Create version manager
     vm = VersionManager(test_db)
 
     # Create first report
-    report1 = Report(
+    report1 = Report.model_construct(
         slug="versioning-test",
         title="Test Report V1",
         url="https://test.com/test",
@@ -232,8 +276,7 @@ def test_versioning():
     vm.create_version(report1, reason, changed)
 
     # Create second version with changes
-    report2 = report1.model_copy()
-    report2.cagr_percent = Decimal("12.0")
+    report2 = Report.model_construct(**{**report1.__dict__, 'cagr_percent': Decimal("12.0")})
     report2.content_hash = report2.compute_content_hash()
 
     should_create2, reason2, changed2 = vm.should_create_version(report2)
@@ -242,55 +285,36 @@ def test_versioning():
     assert 'cagr_percent' in changed2, "Changed fields should include cagr_percent"
     print(f"  ✓ Changed report detected: {changed2}")
 
-    # Clean up test DB
-    import os
-    try:
-        os.remove("data/test_version.duckdb")
-    except:
-        pass
-
-    return True
-
-
-def run_all_tests():
-    """Run all tests."""
-    print("=" * 80)
-    print("MORDOR INTELLIGENCE SCRAPER - TEST SUITE")
-    print("=" * 80)
-
-    tests = [
-        ("Pydantic Models", test_models),
-        ("Regex Patterns", test_regex_patterns),
-        ("JSON-LD Parser", test_jsonld_parser),
-        ("Data Validators", test_validators),
-        ("Versioning", test_versioning),
-    ]
-
-    passed = 0
-    failed = 0
-
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            if result:
-                passed += 1
-        except Exception as e:
-            print(f"  ✗ FAILED: {e}")
-            import traceback
-            traceback.print_exc()
-            failed += 1
-
-    print("\n" + "=" * 80)
-    print(f"RESULTS: {passed} passed, {failed} failed")
-    print("=" * 80)
-
-    if failed == 0:
-        print("✓ All tests passed!")
-        return 0
-    else:
-        print("✗ Some tests failed")
-        return 1
+    # Pre-fetched snapshot gives the same answer as per-report lookups
+    snapshot = vm.load_current_snapshot()
+    assert "versioning-test" in snapshot, "Snapshot should be keyed by slug"
+    assert vm.should_create_version(report2, snapshot) == (should_create2, reason2, changed2)
+    print("  ✓ Snapshot-based change detection matches")
+
+    # Staged versions are written together by flush_versions
+    staged = [vm.stage_version(report2, reason2, changed2)]
+    vm.flush_versions(staged)
+    history = vm.get_version_history("versioning-test")
+    assert [v['version_number'] for v in history] == [1, 2], "Flush should add version 2"
+    print("  ✓ Staged version flushed")
+
+    # One invalid row (CAGR overflows DECIMAL(8,4)) only loses its own report
+    good = Report.model_construct(**{**report1.__dict__, 'slug': "versioning-good", 'url': "https://test.com/good"})
+    bad = Report.model_construct(**{**report1.__dict__, 'slug': "versioning-bad", 'url': "https://test.com/bad",
+                                    'cagr_percent': Decimal("123456")})
+    staged = [vm.stage_version(good, "new_report"), vm.stage_version(bad, "new_report")]
+    failed = vm.flush_versions_isolated(staged)
+    assert [item['report'].slug for item in failed] == ["versioning-bad"]
+    assert 'error' in failed[0] and 'version_id' not in failed[0]
+    assert [v['version_number'] for v in vm.get_version_history("versioning-good")] == [1]
+    assert vm.get_version_history("versioning-bad") == []
+    print("  ✓ Invalid staged row isolated")
 
 
 if __name__ == "__main__":
-    sys.exit(run_all_tests())
+    # Tests touch disjoint state (test_db is a per-worker tmp path), so spread
+    # them over pytest-xdist workers when it is installed
+    args = [__file__, "-v"]
+    if XDIST_AVAILABLE:
+        args += ["-n", "auto"]
+    sys.exit(pytest.main(args))